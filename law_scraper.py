@@ -8,9 +8,10 @@ import json
 import random
 import os
 import sys
+import tempfile
 import tkinter as tk
 from tkinter import ttk, filedialog, simpledialog, messagebox
-from threading import Thread, Lock, Event
+from threading import Thread, Lock, RLock, Event
 from datetime import datetime
 from queue import Queue
 from typing import List, Dict, Set, Optional, Union
@@ -19,6 +20,7 @@ from pathlib import Path
 import argparse
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
 import numpy as np
 from collections import deque
 import uuid
@@ -26,6 +28,22 @@ import platform
 import socket
 import struct
 import statistics
+import heapq
+import bisect
+import sqlite3
+import re
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+# Optional: columnar (Parquet/Feather) export
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = feather = pq = None
 
 # Constants for stealth levels
 STEALTH_LEVELS = {
@@ -71,6 +89,186 @@ STEALTH_LEVELS = {
     }
 }
 
+# Output column -> FirmRecord attribute, in output column order
+FIRM_FIELDS = {
+    "URL": "url",
+    "Firm Name": "firm_name",
+    "Am Law 200 Ranking": "am_law_rank",
+    "NLJ 500 Ranking": "nlj_rank",
+    "Equity Partners": "equity_partners",
+    "Non-Equity Partners": "non_equity_partners",
+    "Total Revenue": "total_revenue",
+    "Profit Per Equity Partner": "profit_per_partner",
+    "Revenue Per Lawyer": "revenue_per_lawyer",
+    "Total Headcount": "headcount",
+    "Firm Description": "description"
+}
+FIRM_COLUMNS = list(FIRM_FIELDS)
+
+# Columns holding dollar amounts and plain counts/ranks
+MONEY_COLUMNS = ["Total Revenue", "Profit Per Equity Partner", "Revenue Per Lawyer"]
+COUNT_COLUMNS = [
+    "Am Law 200 Ranking",
+    "NLJ 500 Ranking",
+    "Equity Partners",
+    "Non-Equity Partners",
+    "Total Headcount"
+]
+
+# Excel number formats for numeric columns
+COLUMN_FORMATS = {
+    "Total Revenue": '"$"#,##0',
+    "Profit Per Equity Partner": '"$"#,##0',
+    "Revenue Per Lawyer": '"$"#,##0',
+    "Equity Partners": '#,##0',
+    "Non-Equity Partners": '#,##0',
+    "Total Headcount": '#,##0'
+}
+
+# Seconds a cached page is served without revalidation when the server sends no max-age
+HTTP_CACHE_TTL = 12 * 60 * 60
+
+# Response headers kept with a cached page; the first three are refreshed on a 304
+CACHED_HEADERS = ("ETag", "Last-Modified", "Cache-Control", "Content-Type")
+
+# Refresh scheduling: weight of ranked firms and the prior change interval
+# assumed for firms with little fetch history
+REFRESH_RANKED_WEIGHT = 3.0
+REFRESH_PRIOR_DAYS = 30
+DEFAULT_REFRESH_BUDGET = 100
+
+# Profile URL template; runs can point it elsewhere, e.g. at the fixture server
+DEFAULT_BASE_URL = "https://www.law.com/americanlawyer/law-firm-profile/?id={}"
+
+# Listing pages and sitemaps used to seed the valid-ID set in discovery runs
+DISCOVERY_SEED_URLS = [
+    "https://www.law.com/rankings/",
+    "https://www.law.com/international-edition/rankings/global-200/",
+    "https://www.law.com/sitemap.xml"
+]
+
+# Discovery gap probing: neighbourhood used by the cluster model, the
+# Beta prior on a hit, and the hit probability below which probing stops
+DISCOVERY_WINDOW = 25
+DISCOVERY_PRIOR = (1.0, 4.0)
+DISCOVERY_MIN_PROBABILITY = 0.05
+
+# Query field names -> indexed output columns
+INDEXED_FIELDS = {
+    "am_law_200": "Am Law 200 Ranking",
+    "nlj_500": "NLJ 500 Ranking",
+    "revenue": "Total Revenue",
+    "ppep": "Profit Per Equity Partner",
+    "rpl": "Revenue Per Lawyer",
+    "headcount": "Total Headcount"
+}
+
+# Columnar export: directory under the save directory, supported formats
+# (file extension per format) and rows per part file
+COLUMNAR_DIR = "columnar"
+COLUMNAR_FORMATS = {"parquet": "parquet", "feather": "feather"}
+COLUMNAR_BATCH_SIZE = 5000
+
+# Summary report: rank tiers per survey column, percentiles reported for
+# money columns, headcount histogram bin edges (last bin open-ended), and
+# the cache files kept in the save directory
+RANK_TIERS = {
+    "Am Law 200 Ranking": [(1, 50), (51, 100), (101, 200)],
+    "NLJ 500 Ranking": [(1, 100), (101, 250), (251, 500)]
+}
+SUMMARY_PERCENTILES = [10, 25, 50, 75, 90]
+HEADCOUNT_BINS = [0, 100, 250, 500, 1000, 2000]
+SUMMARY_CACHE = "summary_cache.json"
+SUMMARY_STATE = "summary_state.npz"
+
+# Ranking history store: directory under the save directory, one .npz
+# partition per survey year
+RANK_HISTORY_DIR = "rank_history"
+
+# Entity resolution: legal-form words dropped from the end of names, the
+# trigram similarity needed to merge, and the size above which a token is
+# too common to be a useful blocking key
+LEGAL_SUFFIXES = {"llp", "llc", "pllc", "pc", "lpa", "ltd", "limited", "plc", "inc", "pa"}
+MATCH_THRESHOLD = 0.8
+MAX_BLOCK_SIZE = 200
+
+# Preflight canary: known-good profile IDs (stored copies live in
+# PREFLIGHT_PAGES_DIR) and the share of sampled pages on which each field
+# must be extracted. Rankings are left out since many firms are unranked.
+PREFLIGHT_IDS = [1, 2, 3, 4, 5]
+PREFLIGHT_PAGES_DIR = "debug_html"
+FIELD_COVERAGE_THRESHOLDS = {
+    "Firm Name": 1.0,
+    "Equity Partners": 0.6,
+    "Total Revenue": 0.6,
+    "Total Headcount": 0.8,
+    "Firm Description": 0.8
+}
+
+# Rolling coverage monitor: pages in the window, and the mean share of the
+# monitored fields found per page below which the run is halted
+COVERAGE_WINDOW = 50
+COVERAGE_MIN_RATE = 0.5
+
+# Columns of the failed/dead-letter output
+FAILED_COLUMNS = ["URL", "Error", "Failure Class", "Attempts"]
+
+# Retry policies per failure class
+RETRY_POLICIES = {
+    "timeout": {
+        "max_retries": 3,
+        "delay": 30,
+        "backoff_factor": 2.0
+    },
+    "connection": {
+        "max_retries": 3,
+        "delay": 60,
+        "backoff_factor": 2.0
+    },
+    "rate_limit": {
+        "max_retries": 5,
+        "delay": 300,
+        "backoff_factor": 2.0
+    },
+    "server_error": {
+        "max_retries": 4,
+        "delay": 120,
+        "backoff_factor": 1.5
+    },
+    "truncated": {
+        "max_retries": 2,
+        "delay": 15,
+        "backoff_factor": 1.0
+    },
+    "parse": {
+        "max_retries": 1,
+        "delay": 60,
+        "backoff_factor": 1.0
+    },
+    "not_cached": {
+        "max_retries": 0,
+        "delay": 0,
+        "backoff_factor": 1.0
+    }
+}
+
+# Job queue: modes a job can run in, default queue file, seconds between
+# worker heartbeats and before a silent running job is reclaimed, and the
+# default request cap (per minute) shared by all workers on a queue
+JOB_MODES = ["discover", "scrape", "refresh", "reparse"]
+DEFAULT_JOB_QUEUE = "jobs.db"
+JOB_HEARTBEAT_INTERVAL = 30
+JOB_STALE_AFTER = 15 * 60
+JOB_POLL_INTERVAL = 30
+DEFAULT_RATE_LIMIT = 20
+
+# Status endpoint: seconds between published metric snapshots, latency
+# samples kept per stage, request-rate window in seconds, and reported quantiles
+METRICS_PUBLISH_INTERVAL = 1.0
+METRICS_LATENCY_SAMPLES = 1000
+METRICS_RATE_WINDOW = 60
+STATUS_QUANTILES = (0.5, 0.9, 0.99)
+
 class UserAgentRotator:
     def __init__(self):
         self.user_agents = [
@@ -304,6 +502,1848 @@ class StealthManager:
         work_min, _ = STEALTH_LEVELS[self.current_level]["work_cycle"]
         return work_min * 30  # Return in seconds, reduced from full duration
 
+MONEY_PATTERN = re.compile(r'^\$?\s*(\d[\d,]*(?:\.\d+)?)\s*([KMB])?$', re.IGNORECASE)
+MONEY_SUFFIXES = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+
+def parse_money(text: Optional[str]) -> Optional[int]:
+    """Parse display amounts such as "$159,713,000" or "$1.2B" into whole dollars."""
+    if text is None:
+        return None
+    match = MONEY_PATTERN.match(str(text).strip())
+    if not match:
+        return None
+    amount = float(match.group(1).replace(",", ""))
+    suffix = match.group(2)
+    return int(round(amount * MONEY_SUFFIXES[suffix.upper()])) if suffix else int(round(amount))
+
+def parse_count(text: Optional[str]) -> Optional[int]:
+    """Parse ranks and headcounts such as "#45", "1,234" or "247*"."""
+    if text is None:
+        return None
+    cleaned = re.sub(r'[#,*\s]', '', str(text))
+    return int(cleaned) if cleaned.isdigit() else None
+
+def firm_id_from_url(url: str) -> Optional[int]:
+    match = re.search(r'[?&]id=(\d+)', url or "")
+    return int(match.group(1)) if match else None
+
+def is_profile_url_template(template: str) -> bool:
+    # Records are keyed by the ID parsed back out of their URL, so it must round-trip
+    try:
+        return firm_id_from_url(template.format(12345)) == 12345
+    except (IndexError, KeyError, ValueError):
+        return False
+
+class FirmRecord:
+    """Parsed firm profile with numeric fields stored as ints (dollars for money)."""
+
+    __slots__ = ("firm_id",) + tuple(FIRM_FIELDS.values())
+
+    def __init__(self, url: str, **fields):
+        self.url = url
+        self.firm_id = firm_id_from_url(url)
+        for attribute in FIRM_FIELDS.values():
+            if attribute != "url":
+                setattr(self, attribute, fields.get(attribute))
+        if self.firm_name is not None:
+            self.firm_name = sys.intern(self.firm_name)
+
+    @classmethod
+    def from_raw(cls, url: str, raw: Dict[str, Optional[str]]) -> 'FirmRecord':
+        # raw holds the display strings keyed by output column
+        fields = {}
+        for column, attribute in FIRM_FIELDS.items():
+            value = raw.get(column)
+            if column in MONEY_COLUMNS:
+                value = parse_money(value)
+            elif column in COUNT_COLUMNS:
+                value = parse_count(value)
+            fields[attribute] = value
+        fields.pop("url")
+        return cls(url, **fields)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FirmRecord':
+        fields = {attribute: data.get(column) for column, attribute in FIRM_FIELDS.items()}
+        return cls(fields.pop("url"), **fields)
+
+    def to_dict(self) -> Dict:
+        return {column: getattr(self, attribute) for column, attribute in FIRM_FIELDS.items()}
+
+    def to_row(self) -> List:
+        return [getattr(self, attribute) for attribute in FIRM_FIELDS.values()]
+
+    def __eq__(self, other):
+        return isinstance(other, FirmRecord) and self.to_row() == other.to_row()
+
+    def __repr__(self):
+        return f"FirmRecord(firm_id={self.firm_id}, firm_name={self.firm_name!r})"
+
+    @staticmethod
+    def to_frame(records) -> pd.DataFrame:
+        df = pd.DataFrame([record.to_row() for record in records], columns=FIRM_COLUMNS)
+        for column in MONEY_COLUMNS + COUNT_COLUMNS:
+            df[column] = df[column].astype("Int64")
+        return df
+
+# Per-cell parse status codes produced by normalize_firm_frame
+PARSE_OK = 0
+PARSE_MISSING = 1
+PARSE_NOT_APPLICABLE = 2
+PARSE_INVALID = 3
+NOT_APPLICABLE_VALUES = ["N/A", "NA", "-", "--"]
+
+def normalize_firm_frame(df: pd.DataFrame):
+    """Convert money/rank/count display columns of a whole result set at once.
+
+    Returns the frame with those columns as nullable Int64 plus a frame of
+    int8 parse-status codes (PARSE_OK, PARSE_MISSING, ...) with the same
+    index and columns. Values that are already numeric pass through.
+    """
+    typed = df.copy()
+    status = pd.DataFrame(index=df.index)
+
+    for column in MONEY_COLUMNS + COUNT_COLUMNS:
+        if column not in df.columns:
+            continue
+
+        # Display values repeat heavily (ranks, "N/A", round amounts), so
+        # parse each distinct value once and broadcast back with the codes.
+        codes, uniques = pd.factorize(df[column], use_na_sentinel=True)
+        values, unique_status = parse_display_values(pd.Series(uniques, dtype=object), column in MONEY_COLUMNS)
+
+        missing = codes == -1
+        safe_codes = np.where(missing, 0, codes)
+        if len(uniques):
+            column_values = np.where(missing, np.nan, values[safe_codes])
+            column_status = np.where(missing, PARSE_MISSING, unique_status[safe_codes])
+        else:
+            column_values = np.full(len(df), np.nan)
+            column_status = np.full(len(df), PARSE_MISSING)
+
+        typed[column] = pd.array(np.round(column_values), dtype="Float64").astype("Int64")
+        status[column] = column_status.astype(np.int8)
+
+    return typed, status
+
+def parse_display_values(raw: pd.Series, is_money: bool):
+    # Returns float values (NaN where unparsed) and int8 status codes
+    numeric = pd.to_numeric(raw, errors="coerce")
+    text = raw.where(numeric.isna()).astype("string").str.strip().str.upper()
+
+    if is_money:
+        parts = text.str.extract(MONEY_PATTERN.pattern, flags=re.IGNORECASE)
+        amounts = pd.to_numeric(parts[0].str.replace(",", "", regex=False), errors="coerce")
+        multipliers = parts[1].map(MONEY_SUFFIXES).astype("Float64").fillna(1)
+        parsed = amounts * multipliers
+    else:
+        cleaned = text.str.replace(r"[#,*\s]", "", regex=True)
+        parsed = pd.to_numeric(cleaned.where(cleaned.str.fullmatch(r"\d+").fillna(False)), errors="coerce")
+
+    values = numeric.fillna(parsed).astype("Float64").to_numpy(dtype=float, na_value=np.nan)
+    empty = (text == "").fillna(False).to_numpy(dtype=bool)
+    not_applicable = text.isin(NOT_APPLICABLE_VALUES).fillna(False).to_numpy(dtype=bool)
+    invalid = np.isnan(values) & ~empty & ~not_applicable
+
+    status = np.select(
+        [empty, not_applicable, invalid],
+        [PARSE_MISSING, PARSE_NOT_APPLICABLE, PARSE_INVALID],
+        PARSE_OK
+    ).astype(np.int8)
+    return values, status
+
+def load_results(path, sheet_name=0):
+    """Load a result workbook (old string-valued or typed) as normalized columns."""
+    df = pd.read_excel(path, sheet_name=sheet_name)
+    return normalize_firm_frame(df)
+
+# Markers delimiting the profile region of a firm page
+PROFILE_START_MARKER = b'class="col-md-12 main_content"'
+PROFILE_END_MARKER = b'Changes in Headcount'
+PROFILE_TITLE_MARKER = b'class="page-title left"'
+
+# Streaming fetch: chunk size, and how far past the main content marker the
+# firm title must appear before a page is treated as the invalid-ID page
+STREAM_CHUNK_SIZE = 16 * 1024
+PROFILE_HEAD_BYTES = 4096
+
+def content_fingerprint(content: bytes) -> str:
+    # Only the profile region is hashed so ads and page chrome don't count as changes
+    start = content.find(PROFILE_START_MARKER)
+    end = content.find(PROFILE_END_MARKER, max(start, 0))
+    region = content[max(start, 0):end if end != -1 else len(content)]
+    return hashlib.sha1(region).hexdigest()
+
+def record_fingerprint(record: 'FirmRecord') -> str:
+    return hashlib.sha1(json.dumps(record.to_dict(), sort_keys=True).encode("utf-8")).hexdigest()
+
+class SnapshotStore:
+    """Body and record fingerprints of the last run, keyed by firm ID.
+
+    An unchanged body lets the scraper reuse the stored record without
+    parsing, and comparing record fingerprints yields the run delta.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.previous = {}
+        self.current = {}
+        self.removed = set()
+
+        if self.path.exists():
+            with open(self.path) as f:
+                self.previous = json.load(f)
+
+    def cached_record(self, firm_id, body_hash, url=None) -> Optional['FirmRecord']:
+        entry = self.previous.get(str(firm_id))
+        if entry and entry["body_hash"] == body_hash:
+            record = FirmRecord.from_dict(entry["record"])
+            # Same page, but it may have been fetched from a different base URL
+            if url is not None:
+                record.url = url
+            return record
+        return None
+
+    def update(self, record: 'FirmRecord', body_hash: str):
+        now = datetime.now().isoformat(timespec='seconds')
+        record_hash = record_fingerprint(record)
+        old = self.previous.get(str(record.firm_id))
+
+        # Fetch/change counts feed the refresh scheduler's change-rate estimate
+        if old:
+            first_fetched = old.get("first_fetched", old["fetched_at"])
+            fetch_count = old.get("fetch_count", 1) + 1
+            change_count = old.get("change_count", 0) + (old["record_hash"] != record_hash)
+        else:
+            first_fetched, fetch_count, change_count = now, 1, 0
+
+        self.current[str(record.firm_id)] = {
+            "body_hash": body_hash,
+            "record_hash": record_hash,
+            "record": record.to_dict(),
+            "fetched_at": now,
+            "first_fetched": first_fetched,
+            "fetch_count": fetch_count,
+            "change_count": change_count
+        }
+
+    def compute_delta(self, seen_ids, scope=None) -> Dict:
+        """Compare this run against the previous snapshot.
+
+        seen_ids are the firm IDs still present this run; previously known
+        firms inside the (start, end) ID scope that were not seen are
+        reported as removed.
+        """
+        delta = {"generated": datetime.now().isoformat(timespec='seconds'), "new": [], "changed": [], "removed": [], "unchanged": 0}
+
+        for firm_id, entry in self.current.items():
+            old = self.previous.get(firm_id)
+            if old is None:
+                delta["new"].append(entry["record"])
+            elif old["record_hash"] != entry["record_hash"]:
+                changes = {
+                    column: [old["record"].get(column), value]
+                    for column, value in entry["record"].items()
+                    if old["record"].get(column) != value
+                }
+                delta["changed"].append({
+                    "firm_id": int(firm_id),
+                    "firm_name": entry["record"]["Firm Name"],
+                    "changes": changes
+                })
+            else:
+                delta["unchanged"] += 1
+
+        seen = {str(firm_id) for firm_id in seen_ids}
+        self.removed = set()
+        if scope:
+            start, end = scope
+            self.removed = {
+                firm_id for firm_id in self.previous
+                if start <= int(firm_id) <= end and firm_id not in seen
+            }
+        for firm_id in sorted(self.removed, key=int):
+            record = self.previous[firm_id]["record"]
+            delta["removed"].append({"firm_id": int(firm_id), "firm_name": record["Firm Name"], "url": record["URL"]})
+
+        return delta
+
+    def save(self):
+        merged = {firm_id: entry for firm_id, entry in self.previous.items() if firm_id not in self.removed}
+        merged.update(self.current)
+        with open(self.path, "w") as f:
+            json.dump(merged, f)
+        self.previous = merged
+        self.current = {}
+        self.removed = set()
+
+class RefreshScheduler:
+    """Picks the known firms whose stored data is most likely stale.
+
+    Each firm's change rate is estimated from its fetch history (with a
+    prior of one change per REFRESH_PRIOR_DAYS), turned into the
+    probability it changed since the last fetch, and weighted up for
+    ranked firms.
+    """
+
+    def __init__(self, snapshot: 'SnapshotStore', ranked_weight: float = REFRESH_RANKED_WEIGHT,
+                 prior_days: float = REFRESH_PRIOR_DAYS):
+        self.snapshot = snapshot
+        self.ranked_weight = ranked_weight
+        self.prior_days = prior_days
+
+    def priority(self, entry: Dict, now: datetime) -> float:
+        last_fetched = datetime.fromisoformat(entry["fetched_at"])
+        first_fetched = datetime.fromisoformat(entry.get("first_fetched", entry["fetched_at"]))
+
+        age_days = max((now - last_fetched).total_seconds() / 86400, 0)
+        observed_days = (last_fetched - first_fetched).total_seconds() / 86400
+        changes_per_day = (entry.get("change_count", 0) + 1) / (observed_days + self.prior_days)
+
+        stale_probability = 1 - np.exp(-changes_per_day * age_days)
+        record = entry["record"]
+        ranked = record.get("Am Law 200 Ranking") is not None or record.get("NLJ 500 Ranking") is not None
+        return stale_probability * (self.ranked_weight if ranked else 1)
+
+    def select(self, budget: int, id_range=None) -> List[str]:
+        now = datetime.now()
+        queue = []
+        for firm_id, entry in self.snapshot.previous.items():
+            if id_range and not id_range[0] <= int(firm_id) <= id_range[1]:
+                continue
+            heapq.heappush(queue, (-self.priority(entry, now), int(firm_id), entry["record"]["URL"]))
+
+        urls = []
+        while queue and len(urls) < budget:
+            _, _, url = heapq.heappop(queue)
+            urls.append(url)
+        return urls
+
+PROFILE_LINK_PATTERN = re.compile(rb'law-firm-profile(?:/|%2F)?(?:\?|%3F)id(?:=|%3D)(\d+)', re.IGNORECASE)
+SITEMAP_LOC_PATTERN = re.compile(rb'<loc>\s*([^<\s]+\.xml)\s*</loc>', re.IGNORECASE)
+
+def extract_profile_ids(content: bytes) -> Set[int]:
+    """Firm IDs linked from a listing page, ranking page, sitemap or profile."""
+    return {int(match) for match in PROFILE_LINK_PATTERN.findall(content)}
+
+class DiscoveryPlanner:
+    """Chooses which unknown IDs to probe, given the IDs already known.
+
+    Valid IDs cluster, so the hit probability of an unprobed ID is taken as
+    the Beta-smoothed hit rate among probed IDs within DISCOVERY_WINDOW of
+    it. Candidates are served best-first from a heap; every probe pushes
+    fresh scores for the unprobed IDs within the window, so the entries
+    left behind with outdated scores are skipped when popped.
+    """
+
+    def __init__(self, id_range, valid_ids=(), invalid_ids=(), window: int = DISCOVERY_WINDOW,
+                 prior=DISCOVERY_PRIOR, min_probability: float = DISCOVERY_MIN_PROBABILITY):
+        self.start, self.end = id_range
+        self.window = window
+        self.prior = prior
+        self.min_probability = min_probability
+        self.valid = sorted(set(valid_ids))
+        self.probed = sorted(set(valid_ids) | set(invalid_ids))
+        self.probed_set = set(self.probed)
+        self.heap = [
+            (-self.probability(candidate), candidate)
+            for candidate in range(self.start, self.end + 1)
+            if candidate not in self.probed_set
+        ]
+        heapq.heapify(self.heap)
+
+    def count_near(self, ids, candidate) -> int:
+        return bisect.bisect_right(ids, candidate + self.window) - bisect.bisect_left(ids, candidate - self.window)
+
+    def probability(self, candidate) -> float:
+        alpha, beta = self.prior
+        hits = self.count_near(self.valid, candidate)
+        probes = self.count_near(self.probed, candidate)
+        return (hits + alpha) / (probes + alpha + beta)
+
+    def add_valid(self, firm_id):
+        if firm_id not in self.probed_set:
+            bisect.insort(self.valid, firm_id)
+            bisect.insort(self.probed, firm_id)
+            self.probed_set.add(firm_id)
+            self.rescore_near(firm_id)
+
+    def add_invalid(self, firm_id):
+        if firm_id not in self.probed_set:
+            bisect.insort(self.probed, firm_id)
+            self.probed_set.add(firm_id)
+            self.rescore_near(firm_id)
+
+    def rescore_near(self, firm_id):
+        # Only candidates within the window of a new probe change score
+        for candidate in range(max(self.start, firm_id - self.window), min(self.end, firm_id + self.window) + 1):
+            if candidate not in self.probed_set:
+                heapq.heappush(self.heap, (-self.probability(candidate), candidate))
+
+    def next_candidate(self) -> Optional[int]:
+        while self.heap:
+            negative_score, candidate = heapq.heappop(self.heap)
+            if candidate in self.probed_set:
+                continue
+            score = self.probability(candidate)
+            # An outdated entry; rescore_near pushed the current score
+            if score != -negative_score:
+                continue
+            if score < self.min_probability:
+                return None
+            return candidate
+        return None
+
+    def candidates(self, budget: Optional[int] = None):
+        probes = 0
+        while budget is None or probes < budget:
+            candidate = self.next_candidate()
+            if candidate is None:
+                return
+            probes += 1
+            yield candidate
+
+class ResultIndex:
+    """In-memory indexes over scraped firms for range, top-k and key lookups.
+
+    Each indexed field keeps parallel sorted lists of (value, firm_id) so
+    range and top-k queries are bisect slices; firm IDs and normalized firm
+    names are hash lookups. add() keeps every index current incrementally.
+    The scraper thread writes while the GUI reads, so both go through a
+    re-entrant lock and readers get copies rather than live containers.
+    """
+
+    def __init__(self):
+        self.lock = RLock()
+        self.records = {}
+        self.by_name = {}
+        self.sorted_keys = {field: [] for field in INDEXED_FIELDS}
+
+    @classmethod
+    def from_snapshot(cls, path) -> 'ResultIndex':
+        index = cls()
+        index.add_many(FirmRecord.from_dict(entry["record"]) for entry in SnapshotStore(path).previous.values())
+        return index
+
+    def __len__(self):
+        return len(self.records)
+
+    @staticmethod
+    def name_key(name: str) -> str:
+        return " ".join(name.lower().split())
+
+    def add(self, record: FirmRecord):
+        with self.lock:
+            old = self.records.get(record.firm_id)
+            if old is not None:
+                self.remove(old)
+
+            self.records[record.firm_id] = record
+            if record.firm_name:
+                self.by_name.setdefault(self.name_key(record.firm_name), set()).add(record.firm_id)
+            for field, column in INDEXED_FIELDS.items():
+                value = getattr(record, FIRM_FIELDS[column])
+                if value is not None:
+                    bisect.insort(self.sorted_keys[field], (value, record.firm_id))
+
+    def add_many(self, records):
+        # Bulk load: append everything, then sort each index once
+        with self.lock:
+            for record in records:
+                if record.firm_id in self.records:
+                    self.add(record)
+                    continue
+                self.records[record.firm_id] = record
+                if record.firm_name:
+                    self.by_name.setdefault(self.name_key(record.firm_name), set()).add(record.firm_id)
+                for field, column in INDEXED_FIELDS.items():
+                    value = getattr(record, FIRM_FIELDS[column])
+                    if value is not None:
+                        self.sorted_keys[field].append((value, record.firm_id))
+            for keys in self.sorted_keys.values():
+                keys.sort()
+
+    def remove(self, record: FirmRecord):
+        with self.lock:
+            self.records.pop(record.firm_id, None)
+            if record.firm_name:
+                ids = self.by_name.get(self.name_key(record.firm_name), set())
+                ids.discard(record.firm_id)
+            for field, column in INDEXED_FIELDS.items():
+                value = getattr(record, FIRM_FIELDS[column])
+                if value is not None:
+                    keys = self.sorted_keys[field]
+                    position = bisect.bisect_left(keys, (value, record.firm_id))
+                    if position < len(keys) and keys[position] == (value, record.firm_id):
+                        del keys[position]
+
+    def get(self, firm_id) -> Optional[FirmRecord]:
+        return self.records.get(firm_id)
+
+    def snapshot(self) -> Dict[int, FirmRecord]:
+        """Copy of the firm ID -> record table, safe to iterate while the scraper adds."""
+        with self.lock:
+            return dict(self.records)
+
+    def find_name(self, name: str) -> List[FirmRecord]:
+        with self.lock:
+            return [self.records[firm_id] for firm_id in sorted(self.by_name.get(self.name_key(name), ()))]
+
+    def range_slice(self, field, low=None, high=None):
+        with self.lock:
+            keys = self.sorted_keys[field]
+            start = 0 if low is None else bisect.bisect_left(keys, (low,))
+            end = len(keys) if high is None else bisect.bisect_right(keys, (high, float("inf")))
+            return keys[start:end]
+
+    def range(self, field, low=None, high=None) -> List[FirmRecord]:
+        with self.lock:
+            return [self.records[firm_id] for _, firm_id in self.range_slice(field, low, high)]
+
+    def top(self, field, k: int, descending: bool = True) -> List[FirmRecord]:
+        with self.lock:
+            keys = self.sorted_keys[field]
+            selected = keys[:-k - 1:-1] if descending else keys[:k]
+            return [self.records[firm_id] for _, firm_id in selected]
+
+    def query(self, ranges: Dict = None, order_by=None, descending: bool = False, limit=None) -> List[FirmRecord]:
+        """Firms matching every (low, high) range, optionally sorted and limited."""
+        with self.lock:
+            ranges = ranges or {}
+            if ranges:
+                # Drive the query from the most selective range, filter by the rest
+                slices = {field: self.range_slice(field, *bounds) for field, bounds in ranges.items()}
+                driver = min(slices, key=lambda field: len(slices[field]))
+                candidates = [firm_id for _, firm_id in slices[driver]]
+                for field, (low, high) in ranges.items():
+                    if field == driver:
+                        continue
+                    attribute = FIRM_FIELDS[INDEXED_FIELDS[field]]
+                    candidates = [
+                        firm_id for firm_id in candidates
+                        if (value := getattr(self.records[firm_id], attribute)) is not None
+                        and (low is None or value >= low) and (high is None or value <= high)
+                    ]
+                records = [self.records[firm_id] for firm_id in candidates]
+            elif order_by:
+                return self.top(order_by, limit or len(self.records), descending)
+            else:
+                records = list(self.records.values())
+
+            if order_by:
+                attribute = FIRM_FIELDS[INDEXED_FIELDS[order_by]]
+                present = [record for record in records if getattr(record, attribute) is not None]
+                records = sorted(present, key=lambda record: getattr(record, attribute), reverse=descending)
+            return records[:limit] if limit else records
+
+def extract_rank_history(soup) -> List[tuple]:
+    """Every (survey, year, rank) listed in a profile's rankings divs; unranked years are skipped."""
+    history = []
+    for rankings in soup.find_all("div", class_="rankings"):
+        survey = rankings.find("p", class_="survey-name-firms")
+        if survey is None:
+            continue
+        for date in rankings.find_all("p", class_="date-firms"):
+            rank = date.find_next_sibling("p", class_="rank-firms")
+            year, value = parse_count(date.get_text()), parse_count(rank.get_text() if rank else None)
+            if year is not None and value is not None:
+                history.append((survey.get_text(strip=True), year, value))
+    return history
+
+class RankHistoryStore:
+    """Long-format (firm, survey, year, rank) store, columnar and partitioned by year.
+
+    Each year is one .npz file of parallel firm/survey/rank arrays, with firm
+    IDs as firm codes and surveys coded through surveys.json. Updates are
+    buffered per firm and replace that firm's earlier rows when saved, and
+    only the touched year partitions are rewritten.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.surveys_path = self.directory / "surveys.json"
+        self.surveys = json.loads(self.surveys_path.read_text()) if self.surveys_path.exists() else []
+        self.pending = {}
+
+    def survey_code(self, survey: str, create: bool = False) -> Optional[int]:
+        if survey not in self.surveys:
+            if not create:
+                return None
+            self.surveys.append(survey)
+        return self.surveys.index(survey)
+
+    def years(self) -> List[int]:
+        return sorted(int(path.stem) for path in self.directory.glob("*.npz"))
+
+    def partition(self, year: int):
+        path = self.directory / f"{year}.npz"
+        if not path.exists():
+            empty = np.empty(0, dtype=np.int32)
+            return empty, empty.astype(np.int16), empty
+        with np.load(path) as data:
+            return data["firm"], data["survey"], data["rank"]
+
+    def update(self, firm_id: int, history):
+        self.pending[firm_id] = [(self.survey_code(survey, create=True), year, rank) for survey, year, rank in history]
+
+    def save(self):
+        if not self.pending:
+            return
+        firms = np.fromiter(self.pending, dtype=np.int32)
+        rows = [(firm_id, code, year, rank) for firm_id, entries in self.pending.items() for code, year, rank in entries]
+        new = np.array(rows, dtype=np.int32).reshape(-1, 4)
+
+        # A re-scraped firm's rows are replaced in every year, including years it no longer lists
+        for year in sorted(set(self.years()) | set(new[:, 2].tolist())):
+            firm, survey, rank = self.partition(year)
+            keep = ~np.isin(firm, firms)
+            added = new[new[:, 2] == year]
+            if not keep.all() or len(added):
+                firm = np.concatenate([firm[keep], added[:, 0]]).astype(np.int32)
+                survey = np.concatenate([survey[keep], added[:, 1]]).astype(np.int16)
+                rank = np.concatenate([rank[keep], added[:, 3]]).astype(np.int32)
+                order = np.lexsort((firm, survey))
+                np.savez_compressed(self.directory / f"{year}.npz", firm=firm[order], survey=survey[order], rank=rank[order])
+
+        self.surveys_path.write_text(json.dumps(self.surveys))
+        self.pending = {}
+
+    def load(self, years=None) -> Dict[str, np.ndarray]:
+        columns = {"firm": [], "survey": [], "year": [], "rank": []}
+        for year in (years if years is not None else self.years()):
+            firm, survey, rank = self.partition(year)
+            columns["firm"].append(firm)
+            columns["survey"].append(survey)
+            columns["year"].append(np.full(len(firm), year, dtype=np.int16))
+            columns["rank"].append(rank)
+        return {
+            name: np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+            for name, parts in columns.items()
+        }
+
+    def series(self, firm_id: int) -> List[tuple]:
+        columns = self.load()
+        mask = columns["firm"] == firm_id
+        return sorted(
+            (self.surveys[code], int(year), int(rank))
+            for code, year, rank in zip(columns["survey"][mask], columns["year"][mask], columns["rank"][mask])
+        )
+
+    def climbers(self, survey: str, min_places: int, start_year: Optional[int] = None,
+                 end_year: Optional[int] = None, span: int = 5) -> List[Dict]:
+        """Firms whose rank in `survey` improved by at least min_places between two years."""
+        code = self.survey_code(survey)
+        years = self.years()
+        if code is None or not years:
+            return []
+        end_year = end_year if end_year is not None else years[-1]
+        start_year = start_year if start_year is not None else end_year - span
+
+        start_firm, start_survey, start_rank = self.partition(start_year)
+        end_firm, end_survey, end_rank = self.partition(end_year)
+        start_mask, end_mask = start_survey == code, end_survey == code
+        firms, start_at, end_at = np.intersect1d(start_firm[start_mask], end_firm[end_mask], return_indices=True)
+
+        before, after = start_rank[start_mask][start_at], end_rank[end_mask][end_at]
+        climb = before - after
+        selected = np.flatnonzero(climb >= min_places)
+        selected = selected[np.argsort(-climb[selected], kind="stable")]
+        return [
+            {"firm_id": int(firm_id), "start_rank": int(start), "end_rank": int(end), "climb": int(change)}
+            for firm_id, start, end, change in zip(firms[selected], before[selected], after[selected], climb[selected])
+        ]
+
+class SearchIndex:
+    """SQLite FTS5 full-text index over firm names and descriptions.
+
+    Rows are keyed by firm ID (the FTS rowid), so re-adding a firm replaces
+    its previous text. Results are ranked by BM25 with name matches
+    weighted above description matches.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS firms "
+            "USING fts5(firm_name, description, tokenize='porter unicode61')"
+        )
+        self.pending = 0
+
+    def count(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT count(*) FROM firms").fetchone()[0]
+
+    def add(self, record: FirmRecord):
+        if record.firm_id is None:
+            return
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO firms(rowid, firm_name, description) VALUES (?, ?, ?)",
+                (record.firm_id, record.firm_name or "", record.description or "")
+            )
+            self.pending += 1
+            if self.pending >= 500:
+                self.connection.commit()
+                self.pending = 0
+
+    def add_many(self, records):
+        for record in records:
+            self.add(record)
+        self.commit()
+
+    def commit(self):
+        with self.lock:
+            self.connection.commit()
+            self.pending = 0
+
+    @staticmethod
+    def to_match_expression(text: str) -> str:
+        # Quote each keyword so punctuation like "&" or "-" isn't read as FTS syntax
+        return " ".join('"' + token.replace('"', '""') + '"' for token in text.split())
+
+    def search(self, text: str, limit: int = 20, raw: bool = False) -> List[Dict]:
+        expression = text if raw else self.to_match_expression(text)
+        if not expression:
+            return []
+        with self.lock:
+            try:
+                rows = self.connection.execute(
+                    "SELECT rowid, firm_name, snippet(firms, 1, '[', ']', '...', 12), bm25(firms, 10.0, 1.0) AS score "
+                    "FROM firms WHERE firms MATCH ? ORDER BY score LIMIT ?",
+                    (expression, limit)
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                # Only raw queries can reach here; quoted keywords are always valid FTS5
+                raise ValueError(f"Invalid search query {text!r}: {e}") from e
+        return [
+            {"firm_id": firm_id, "firm_name": firm_name, "snippet": snippet, "score": -score}
+            for firm_id, firm_name, snippet, score in rows
+        ]
+
+    def close(self):
+        self.commit()
+        self.connection.close()
+
+def normalize_firm_name(name: str) -> str:
+    tokens = re.sub(r"[^a-z0-9 ]+", " ", name.lower().replace(".", "")).split()
+    # "Baker & McKenzie" and "Baker McKenzie" are the same firm, so connectors go
+    stripped = [token for token in tokens if token != "and"]
+    while stripped and stripped[-1] in LEGAL_SUFFIXES:
+        stripped.pop()
+    # A name that is nothing but a legal form ("LLP") keeps it rather than becoming empty
+    return " ".join(stripped or tokens)
+
+def name_trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class EntityResolver:
+    """Groups records that describe the same firm under one canonical ID.
+
+    Names are normalized and identical normalized names merged in one
+    pass; one record per distinct name is then blocked on its tokens so
+    that only names sharing an uncommon token are compared. Pairs whose
+    name trigram Jaccard similarity reaches the threshold are merged with
+    union-find; the canonical ID of a group is its smallest firm ID.
+    Nameless records are kept as groups of their own.
+    """
+
+    def __init__(self, threshold: float = MATCH_THRESHOLD, max_block_size: int = MAX_BLOCK_SIZE):
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+
+    def blocks(self, normalized: Dict[int, str]) -> Dict[str, List[int]]:
+        blocks = {}
+        for firm_id, name in normalized.items():
+            for token in set(name.split()):
+                blocks.setdefault(token, []).append(firm_id)
+        return {key: ids for key, ids in blocks.items() if 1 < len(ids) <= self.max_block_size}
+
+    def resolve(self, records: List[FirmRecord]) -> Dict[int, List[FirmRecord]]:
+        records = {record.firm_id: record for record in records}
+        parent = {firm_id: firm_id for firm_id in records}
+
+        # Exact matches join the first (smallest) ID with their name, which
+        # alone stands for the name in the pairwise comparisons below
+        representatives = {}
+        for firm_id in sorted(records):
+            name = normalize_firm_name(records[firm_id].firm_name or "")
+            if not name:
+                continue
+            parent[firm_id] = representatives.setdefault(name, firm_id)
+        normalized = {firm_id: name for name, firm_id in representatives.items()}
+        trigrams = {firm_id: name_trigrams(name) for firm_id, name in normalized.items()}
+        sizes_of = {firm_id: len(grams) for firm_id, grams in trigrams.items()}
+
+        def find(firm_id):
+            while parent[firm_id] != firm_id:
+                parent[firm_id] = parent[parent[firm_id]]
+                firm_id = parent[firm_id]
+            return firm_id
+
+        compared = set()
+        for ids in self.blocks(normalized).values():
+            for i, left in enumerate(ids):
+                for right in ids[i + 1:]:
+                    # Jaccard >= t needs the smaller trigram set to be >= t of the larger
+                    sizes = sizes_of[left], sizes_of[right]
+                    if min(sizes) < self.threshold * max(sizes):
+                        continue
+                    pair = (left, right) if left < right else (right, left)
+                    if pair in compared:
+                        continue
+                    compared.add(pair)
+                    if find(left) == find(right):
+                        continue
+                    if self.similarity(trigrams[left], trigrams[right]) >= self.threshold:
+                        root_left, root_right = find(left), find(right)
+                        parent[max(root_left, root_right)] = min(root_left, root_right)
+
+        groups = {}
+        for firm_id in sorted(records):
+            groups.setdefault(find(firm_id), []).append(records[firm_id])
+        return groups
+
+    @staticmethod
+    def similarity(left: Set[str], right: Set[str]) -> float:
+        return len(left & right) / len(left | right) if left and right else 0
+
+    @staticmethod
+    def merge(members: List[FirmRecord]) -> FirmRecord:
+        # Field by field, take the first value from the most complete records
+        ranked = sorted(members, key=lambda record: (-sum(value is not None for value in record.to_row()), record.firm_id))
+        merged = {column: next((getattr(record, attribute) for record in ranked if getattr(record, attribute) is not None), None)
+                  for column, attribute in FIRM_FIELDS.items()}
+        merged["URL"] = min(members, key=lambda record: record.firm_id).url
+        return FirmRecord.from_dict(merged)
+
+class CoverageMonitor:
+    """Rolling extraction hit rate over the most recently parsed pages."""
+
+    def __init__(self, fields=None, window: int = COVERAGE_WINDOW, min_rate: float = COVERAGE_MIN_RATE):
+        self.attributes = [FIRM_FIELDS[column] for column in (fields or FIELD_COVERAGE_THRESHOLDS)]
+        self.history = deque(maxlen=window)
+        self.min_rate = min_rate
+
+    def observe(self, record: FirmRecord):
+        found = sum(getattr(record, attribute) is not None for attribute in self.attributes)
+        self.history.append(found / len(self.attributes))
+
+    def rate(self) -> float:
+        return sum(self.history) / len(self.history) if self.history else 1.0
+
+    def collapsed(self) -> bool:
+        return len(self.history) == self.history.maxlen and self.rate() < self.min_rate
+
+class PageResponse:
+    """Minimal stand-in for requests.Response holding a fully or partially read body."""
+
+    def __init__(self, url, status_code, content, headers, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+class ProfileStreamScanner:
+    """Buffers a streamed page and reports when the profile block has arrived.
+
+    feed() returns True once reading can stop: either the end-of-profile
+    marker was seen ("complete") or the main content area opened without a
+    firm title, which is the invalid-ID page ("invalid"). Otherwise the
+    state stays "reading" until the stream ends.
+    """
+
+    def __init__(self, scan: bool = True):
+        self.scan = scan
+        self.buffer = bytearray()
+        self.state = "reading"
+        self.start = -1
+
+    def feed(self, chunk: bytes) -> bool:
+        # Re-check the tail of the previous chunk in case a marker straddles chunks
+        overlap = max(len(PROFILE_START_MARKER), len(PROFILE_END_MARKER))
+        search_from = max(len(self.buffer) - overlap, 0)
+        self.buffer.extend(chunk)
+        if not self.scan:
+            return False
+
+        if self.start == -1:
+            self.start = self.buffer.find(PROFILE_START_MARKER, search_from)
+        if self.start == -1:
+            return False
+
+        if self.buffer.find(PROFILE_END_MARKER, max(search_from, self.start)) != -1:
+            self.state = "complete"
+            return True
+
+        head = self.buffer[self.start:self.start + PROFILE_HEAD_BYTES]
+        if len(head) == PROFILE_HEAD_BYTES and PROFILE_TITLE_MARKER not in head:
+            self.state = "invalid"
+            return True
+        return False
+
+class HttpCache:
+    """Persistent per-URL cache of page bodies and their validators.
+
+    Each URL gets a <sha1>.body file plus a <sha1>.json file holding the
+    ETag/Last-Modified validators and freshness lifetime, so entries can
+    be written independently without rewriting a shared index.
+    """
+
+    def __init__(self, directory, default_ttl: float = HTTP_CACHE_TTL):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.default_ttl = default_ttl
+
+    def paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def lookup(self, url) -> Optional[Dict]:
+        meta_path, body_path = self.paths(url)
+        if not meta_path.exists() or not body_path.exists():
+            return None
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry["stored_at"] < entry["ttl"]
+
+    def load(self, url, entry: Dict) -> PageResponse:
+        _, body_path = self.paths(url)
+        return PageResponse(url, entry["status_code"], body_path.read_bytes(), entry["headers"], from_cache=True)
+
+    def conditional_headers(self, entry: Dict) -> Dict:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, response):
+        meta_path, body_path = self.paths(url)
+        body_path.write_bytes(response.content)
+        self.write_meta(meta_path, url, response.status_code, response.headers)
+
+    def evict(self, url):
+        for path in self.paths(url):
+            path.unlink(missing_ok=True)
+
+    def refresh(self, url, entry: Dict, response):
+        # 304: keep the stored body, take the new validators and lifetime
+        meta_path, _ = self.paths(url)
+        headers = requests.structures.CaseInsensitiveDict(entry["headers"])
+        fresh = requests.structures.CaseInsensitiveDict(response.headers)
+        headers.update({name: fresh[name] for name in CACHED_HEADERS[:3] if name in fresh})
+        self.write_meta(meta_path, url, entry["status_code"], headers)
+
+    def write_meta(self, meta_path, url, status_code, headers):
+        # Servers differ in header casing; store the canonical names
+        headers = requests.structures.CaseInsensitiveDict(headers)
+        headers = {name: headers[name] for name in CACHED_HEADERS if name in headers}
+        with open(meta_path, "w") as f:
+            json.dump({
+                "url": url,
+                "status_code": status_code,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "headers": headers,
+                "stored_at": time.time(),
+                "ttl": self.freshness_lifetime(headers)
+            }, f)
+
+    def freshness_lifetime(self, headers) -> float:
+        cache_control = headers.get("Cache-Control", "").lower()
+        if "no-store" in cache_control or "no-cache" in cache_control:
+            return 0
+        match = re.search(r'max-age=(\d+)', cache_control)
+        return int(match.group(1)) if match else self.default_ttl
+
+class FetchError(Exception):
+    def __init__(self, failure_class: str, message: str, status_code: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.failure_class = failure_class
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class RetryQueue:
+    """Schedules failed items for another attempt according to RETRY_POLICIES.
+
+    Items whose failure class has exhausted its budget are moved to the
+    dead-letter list together with their full error history.
+    """
+
+    def __init__(self, policies: Dict = None):
+        self.policies = policies or RETRY_POLICIES
+        self.heap = []
+        self.attempts = {}
+        self.history = {}
+        self.dead_letters = []
+        self.total_scheduled = 0
+        self.counter = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, key, url: str, error: FetchError) -> bool:
+        policy = self.policies[error.failure_class]
+        attempt_key = (key, error.failure_class)
+        attempts = self.attempts.get(attempt_key, 0) + 1
+        self.attempts[attempt_key] = attempts
+
+        self.history.setdefault(key, []).append({
+            "time": datetime.now().isoformat(),
+            "failure_class": error.failure_class,
+            "message": str(error),
+            "status_code": error.status_code
+        })
+
+        if attempts > policy["max_retries"]:
+            errors = self.history.pop(key)
+            self.dead_letters.append({
+                "key": key,
+                "url": url,
+                "failure_class": error.failure_class,
+                "attempts": len(errors),
+                "last_error": str(error),
+                "errors": errors
+            })
+            return False
+
+        delay = policy["delay"] * (policy["backoff_factor"] ** (attempts - 1))
+        if error.retry_after:
+            delay = max(delay, error.retry_after)
+
+        self.counter += 1
+        self.total_scheduled += 1
+        heapq.heappush(self.heap, (time.time() + delay, self.counter, key))
+        return True
+
+    def resolve(self, key):
+        # Forget the error history of an item that eventually succeeded
+        self.history.pop(key, None)
+
+    def pending(self) -> List:
+        return [key for _, _, key in self.heap]
+
+    def pop_due(self, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        if self.heap and self.heap[0][0] <= now:
+            return heapq.heappop(self.heap)[2]
+        return None
+
+    def seconds_until_next(self) -> float:
+        if not self.heap:
+            return 0
+        return max(0, self.heap[0][0] - time.time())
+
+    def to_state(self) -> Dict:
+        return {
+            "pending": [[due, key] for due, _, key in self.heap],
+            "attempts": [[key, failure_class, count] for (key, failure_class), count in self.attempts.items()],
+            "history": [[key, errors] for key, errors in self.history.items()],
+            "dead_letters": self.dead_letters
+        }
+
+    def load_state(self, state: Dict):
+        for due, key in state.get("pending", []):
+            self.counter += 1
+            heapq.heappush(self.heap, (due, self.counter, key))
+        self.attempts = {(key, failure_class): count for key, failure_class, count in state.get("attempts", [])}
+        self.history = {key: errors for key, errors in state.get("history", [])}
+        self.dead_letters = state.get("dead_letters", [])
+        self.total_scheduled = len(self.heap)
+
+    def save_dead_letters(self, path):
+        with open(path, "w") as f:
+            json.dump(self.dead_letters, f, indent=4)
+
+class StreamingExcelWriter:
+    """Streams rows into a write-only openpyxl workbook.
+
+    Rows are flushed to disk as they are appended, so memory stays flat
+    regardless of how many records are exported.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.workbook = Workbook(write_only=True)
+        self.sheets = {}
+
+    def create_sheet(self, title: str, columns: List[str]):
+        sheet = self.workbook.create_sheet(title)
+        sheet.append(columns)
+        self.sheets[title] = (sheet, columns)
+        return sheet
+
+    def append(self, title: str, row):
+        sheet, columns = self.sheets[title]
+        if isinstance(row, FirmRecord):
+            row = row.to_row()
+        elif isinstance(row, dict):
+            row = [row.get(column) for column in columns]
+        sheet.append([self.make_cell(sheet, column, value) for column, value in zip(columns, row)])
+
+    def write_sheet(self, title: str, columns: List[str], rows):
+        self.create_sheet(title, columns)
+        count = 0
+        for row in rows:
+            self.append(title, row)
+            count += 1
+        return count
+
+    def make_cell(self, sheet, column, value):
+        if value is None:
+            return None
+        if isinstance(value, (dict, list, tuple, set)):
+            return json.dumps(value if not isinstance(value, set) else sorted(value))
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and column in COLUMN_FORMATS:
+            cell = WriteOnlyCell(sheet, value=value)
+            cell.number_format = COLUMN_FORMATS[column]
+            return cell
+        return value
+
+    def save(self):
+        self.workbook.save(self.path)
+        return self.path
+
+def columnar_schema():
+    # Text columns are dictionary-encoded; money needs 64 bits, counts and ranks fit in 32
+    fields = [pa.field("Firm ID", pa.int32())]
+    for column in FIRM_COLUMNS:
+        if column in MONEY_COLUMNS:
+            fields.append(pa.field(column, pa.int64()))
+        elif column in COUNT_COLUMNS:
+            fields.append(pa.field(column, pa.int32()))
+        else:
+            fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+    return pa.schema(fields)
+
+class ColumnarExporter:
+    """Appends records to typed Parquet/Feather part files partitioned by run date.
+
+    Records are buffered and written every COLUMNAR_BATCH_SIZE rows as a new
+    part file under run_date=YYYY-MM-DD/, so a crashed run still leaves its
+    completed parts readable. manifest.json lists every run with its parts
+    and row count and is what load_columnar selects snapshots from. Needs
+    pyarrow; check ColumnarExporter.available() first.
+    """
+
+    def __init__(self, directory, file_format: str = "parquet"):
+        if file_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format {file_format!r}; expected one of {', '.join(COLUMNAR_FORMATS)}")
+        self.directory = Path(directory)
+        self.file_format = file_format
+        self.schema = columnar_schema()
+        started = datetime.now()
+        self.run_date = started.strftime("%Y-%m-%d")
+        self.run_id = started.strftime("%Y%m%dT%H%M%S")
+        self.partition = self.directory / f"run_date={self.run_date}"
+        self.partition.mkdir(parents=True, exist_ok=True)
+        self.buffer = []
+        self.files = []
+        self.rows = 0
+
+    @staticmethod
+    def available() -> bool:
+        return pa is not None
+
+    def append(self, record: FirmRecord):
+        self.buffer.append(record)
+        if len(self.buffer) >= COLUMNAR_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        columns = [[record.firm_id for record in self.buffer]]
+        columns += [[getattr(record, attribute) for record in self.buffer] for attribute in FIRM_FIELDS.values()]
+        arrays = [
+            pa.array(values, pa.string()).dictionary_encode() if pa.types.is_dictionary(field.type)
+            else pa.array(values, field.type)
+            for values, field in zip(columns, self.schema)
+        ]
+        table = pa.Table.from_arrays(arrays, schema=self.schema)
+
+        path = self.partition / f"part-{self.run_id}-{len(self.files):04d}.{COLUMNAR_FORMATS[self.file_format]}"
+        if self.file_format == "parquet":
+            pq.write_table(table, path, compression="zstd", use_dictionary=True)
+        else:
+            feather.write_feather(table, path, compression="zstd")
+
+        self.files.append(path.relative_to(self.directory).as_posix())
+        self.rows += len(self.buffer)
+        self.buffer = []
+        self.write_manifest()
+
+    def write_manifest(self):
+        manifest = read_columnar_manifest(self.directory)
+        runs = [run for run in manifest["runs"] if run["run_id"] != self.run_id]
+        runs.append({
+            "run_id": self.run_id,
+            "run_date": self.run_date,
+            "format": self.file_format,
+            "files": self.files,
+            "rows": self.rows,
+            "updated": datetime.now().isoformat(timespec='seconds')
+        })
+        manifest["runs"] = sorted(runs, key=lambda run: run["run_id"])
+        with open(self.directory / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=4)
+
+    def close(self):
+        self.flush()
+        return self.rows
+
+def read_columnar_manifest(directory) -> Dict:
+    path = Path(directory) / "manifest.json"
+    if not path.exists():
+        return {"schema": ["Firm ID"] + FIRM_COLUMNS, "runs": []}
+    with open(path) as f:
+        return json.load(f)
+
+def load_columnar(store, run_id: Optional[str] = None, run_date: Optional[str] = None,
+                  all_runs: bool = False) -> pd.DataFrame:
+    """Load a save directory's columnar export.
+
+    Only the latest run is loaded unless a run ID, a run date or all_runs
+    is given.
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required to load columnar exports")
+    directory = Path(store) / COLUMNAR_DIR
+    runs = read_columnar_manifest(directory)["runs"]
+    if run_id:
+        runs = [run for run in runs if run["run_id"] == run_id]
+    elif run_date:
+        runs = [run for run in runs if run["run_date"] == run_date]
+    elif not all_runs:
+        runs = runs[-1:]
+
+    tables = []
+    for run in runs:
+        read = pq.read_table if run["format"] == "parquet" else feather.read_table
+        for file in run["files"]:
+            table = read(directory / file)
+            tables.append(table.append_column("Run ID", pa.array([run["run_id"]] * len(table), pa.string())))
+    if not tables:
+        return pd.DataFrame(columns=["Firm ID"] + FIRM_COLUMNS)
+
+    table = pa.concat_tables(tables, promote_options="permissive")
+    nullable = {pa.int32(): pd.Int64Dtype(), pa.int64(): pd.Int64Dtype()}
+    return table.to_pandas(types_mapper=nullable.get)
+
+class SummaryReport:
+    """Aggregate statistics over every known firm, cached by dataset hash.
+
+    The per-firm values behind the aggregates are kept as a float matrix
+    (one row per firm, NaN where missing) in SUMMARY_STATE. After a run
+    only the delta's new, changed and removed firms are patched into it
+    before the aggregates are recomputed; a dataset whose hash matches
+    the cache is answered straight from SUMMARY_CACHE.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.cache_path = self.directory / SUMMARY_CACHE
+        self.state_path = self.directory / SUMMARY_STATE
+        self.cache = {}
+        if self.cache_path.exists():
+            with open(self.cache_path) as f:
+                self.cache = json.load(f)
+        # How the last update() was answered: "cache", "delta" or "rebuilt"
+        self.source = None
+
+    @staticmethod
+    def dataset_hash(entries: Dict) -> str:
+        # entries are snapshot entries keyed by firm ID
+        digest = hashlib.sha1()
+        for firm_id in sorted(entries, key=int):
+            digest.update(f"{firm_id}:{entries[firm_id]['record_hash']};".encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def record_row(record: Dict) -> List[float]:
+        # Text columns only count towards coverage, so they're stored as 1.0 when present
+        row = []
+        for column in FIRM_COLUMNS:
+            value = record.get(column)
+            if isinstance(value, (int, float)):
+                row.append(float(value))
+            else:
+                row.append(1.0 if value else np.nan)
+        return row
+
+    def build(self, entries: Dict):
+        ids = np.array(sorted(map(int, entries)), dtype=np.int64)
+        values = np.array([self.record_row(entries[str(firm_id)]["record"]) for firm_id in ids], dtype=float)
+        return ids, values.reshape(len(ids), len(FIRM_COLUMNS))
+
+    def apply_delta(self, ids, values, delta: Dict, entries: Dict):
+        removed = [entry["firm_id"] for entry in delta["removed"]]
+        if removed:
+            keep = ~np.isin(ids, removed)
+            ids, values = ids[keep], values[keep]
+
+        updated = sorted({firm_id_from_url(record["URL"]) for record in delta["new"]}
+                         | {entry["firm_id"] for entry in delta["changed"]})
+        if updated:
+            rows = np.array([self.record_row(entries[str(firm_id)]["record"]) for firm_id in updated], dtype=float)
+            updated = np.array(updated, dtype=np.int64)
+            present = np.isin(updated, ids)
+            values[np.searchsorted(ids, updated[present])] = rows[present]
+            ids = np.concatenate([ids, updated[~present]])
+            values = np.concatenate([values, rows[~present]])
+            order = np.argsort(ids, kind="stable")
+            ids, values = ids[order], values[order]
+        return ids, values
+
+    def update(self, entries: Dict, delta: Optional[Dict] = None, base_hash: Optional[str] = None) -> Dict:
+        """Return the summary for `entries`, reusing or patching cached state where possible."""
+        dataset_hash = self.dataset_hash(entries)
+        if self.cache.get("dataset_hash") == dataset_hash and self.cache.get("summary"):
+            self.source = "cache"
+            return self.cache["summary"]
+
+        state = None
+        if delta is not None and base_hash and self.cache.get("dataset_hash") == base_hash and self.state_path.exists():
+            with np.load(self.state_path) as data:
+                state = self.apply_delta(data["ids"], data["values"], delta, entries)
+            # A state that drifted from the snapshot is rebuilt rather than trusted
+            if len(state[0]) != len(entries):
+                state = None
+        self.source = "delta" if state is not None else "rebuilt"
+        ids, values = state if state is not None else self.build(entries)
+
+        summary = self.compute(values)
+        summary["dataset_hash"] = dataset_hash
+        np.savez_compressed(self.state_path, ids=ids, values=values)
+        self.cache = {"dataset_hash": dataset_hash, "summary": summary}
+        with open(self.cache_path, "w") as f:
+            json.dump(self.cache, f, indent=4)
+        return summary
+
+    def compute(self, values: np.ndarray) -> Dict:
+        column = {name: values[:, i] for i, name in enumerate(FIRM_COLUMNS)}
+        total = len(values)
+
+        tiers = {}
+        for name, bounds in RANK_TIERS.items():
+            ranks = column[name]
+            tiers[name] = {f"{low}-{high}": int(((ranks >= low) & (ranks <= high)).sum()) for low, high in bounds}
+            tiers[name]["Unranked"] = int(np.isnan(ranks).sum())
+
+        percentiles = {}
+        for name in MONEY_COLUMNS:
+            present = column[name][~np.isnan(column[name])]
+            percentiles[name] = {"count": int(len(present))}
+            if len(present):
+                points = np.percentile(present, SUMMARY_PERCENTILES)
+                percentiles[name].update({f"p{p}": int(round(v)) for p, v in zip(SUMMARY_PERCENTILES, points)})
+                percentiles[name].update({"mean": int(round(present.mean())), "min": int(present.min()), "max": int(present.max())})
+
+        headcount = column["Total Headcount"]
+        headcount = headcount[~np.isnan(headcount)]
+        counts = np.bincount(np.searchsorted(HEADCOUNT_BINS, headcount, side="right") - 1, minlength=len(HEADCOUNT_BINS))
+        labels = [f"{low}-{high - 1}" for low, high in zip(HEADCOUNT_BINS, HEADCOUNT_BINS[1:])] + [f"{HEADCOUNT_BINS[-1]}+"]
+
+        coverage = (~np.isnan(values)).mean(axis=0) if total else np.zeros(len(FIRM_COLUMNS))
+        return {
+            "generated": datetime.now().isoformat(timespec='seconds'),
+            "firms": total,
+            "rank_tiers": tiers,
+            "percentiles": percentiles,
+            "headcount_distribution": {
+                "bins": dict(zip(labels, counts.tolist())),
+                "median": int(np.median(headcount)) if len(headcount) else None
+            },
+            "coverage": {name: round(float(rate), 4) for name, rate in zip(FIRM_COLUMNS, coverage)}
+        }
+
+    @staticmethod
+    def write(summary: Dict, output_file) -> List[Path]:
+        with open(f"{output_file}_summary.json", "w") as f:
+            json.dump(summary, f, indent=4)
+
+        writer = StreamingExcelWriter(f"{output_file}_summary.xlsx")
+        writer.write_sheet("Overview", ["Metric", "Value"], [
+            ("Firms", summary["firms"]),
+            ("Generated", summary["generated"]),
+            ("Dataset Hash", summary["dataset_hash"])
+        ])
+        writer.write_sheet("Rank Tiers", ["Survey", "Tier", "Firms"], [
+            (survey, tier, count) for survey, tiers in summary["rank_tiers"].items() for tier, count in tiers.items()
+        ])
+        stats = ["count"] + [f"p{p}" for p in SUMMARY_PERCENTILES] + ["mean", "min", "max"]
+        writer.write_sheet("Percentiles", ["Column"] + stats, [
+            [name] + [values.get(stat) for stat in stats] for name, values in summary["percentiles"].items()
+        ])
+        writer.write_sheet("Headcount", ["Headcount", "Firms"], summary["headcount_distribution"]["bins"].items())
+        writer.write_sheet("Coverage", ["Column", "Coverage"], summary["coverage"].items())
+        return [Path(f"{output_file}_summary.json"), writer.save()]
+
+    @staticmethod
+    def write_charts(summary: Dict, output_file) -> List[Path]:
+        # Figure objects render through the Agg canvas, so this is safe off the Tk thread
+        paths = []
+
+        figure = Figure(figsize=(8, 4))
+        for axis, (survey, tiers) in zip(figure.subplots(1, len(summary["rank_tiers"])), summary["rank_tiers"].items()):
+            axis.bar(list(tiers), list(tiers.values()))
+            axis.set_title(survey)
+            axis.set_ylabel("Firms")
+        figure.tight_layout()
+        paths.append(Path(f"{output_file}_rank_tiers.png"))
+        figure.savefig(paths[-1])
+
+        figure = Figure(figsize=(8, 4))
+        axis = figure.subplots()
+        bins = summary["headcount_distribution"]["bins"]
+        axis.bar(list(bins), list(bins.values()))
+        axis.set_title("Total Headcount")
+        axis.set_ylabel("Firms")
+        figure.tight_layout()
+        paths.append(Path(f"{output_file}_headcount.png"))
+        figure.savefig(paths[-1])
+
+        figure = Figure(figsize=(8, 4))
+        axis = figure.subplots()
+        coverage = summary["coverage"]
+        axis.barh(list(coverage), [rate * 100 for rate in coverage.values()])
+        axis.set_xlim(0, 100)
+        axis.set_xlabel("Coverage (%)")
+        figure.tight_layout()
+        paths.append(Path(f"{output_file}_coverage.png"))
+        figure.savefig(paths[-1])
+        return paths
+
+class JobQueue:
+    """Durable queue of scrape jobs in a SQLite file.
+
+    Each job covers an ID range or list in one of JOB_MODES and writes to a
+    sink (output file prefix) under its store directory. Workers claim jobs
+    by priority, heartbeat while running and checkpoint on the job row, so
+    a job left by a crashed worker is reclaimed and resumed. The same file
+    holds the request-slot clock that enforces the shared rate cap.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = Lock()
+        self.connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, mode TEXT NOT NULL, store TEXT NOT NULL, sink TEXT NOT NULL, "
+            "range_start INTEGER, range_end INTEGER, ids TEXT, options TEXT, priority INTEGER NOT NULL DEFAULT 0, "
+            "status TEXT NOT NULL DEFAULT 'queued', attempts INTEGER NOT NULL DEFAULT 0, worker TEXT, "
+            "heartbeat REAL, checkpoint TEXT, result TEXT, error TEXT, created TEXT, updated TEXT)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs(status, priority DESC, id)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS rate_clock (id INTEGER PRIMARY KEY CHECK (id = 1), next_slot REAL)")
+
+    def add(self, mode: str, store, sink=None, id_range=None, ids=None, priority: int = 0, options: Dict = None) -> int:
+        if mode not in JOB_MODES:
+            raise ValueError(f"Unknown job mode {mode!r}; expected one of {', '.join(JOB_MODES)}")
+        if mode == "discover" and id_range is None:
+            raise ValueError("Discover jobs need an ID range")
+        range_start, range_end = id_range or (None, None)
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT INTO jobs(mode, store, sink, range_start, range_end, ids, options, priority, created, updated) "
+                "VALUES (?, ?, '', ?, ?, ?, ?, ?, ?, ?)",
+                (mode, str(store), range_start, range_end, json.dumps(ids) if ids else None,
+                 json.dumps(options or {}), priority, now, now)
+            )
+            job_id = cursor.lastrowid
+            # Jobs sharing a store get distinct output files by default
+            self.connection.execute(
+                "UPDATE jobs SET sink = ? WHERE id = ?",
+                (str(sink or Path(store) / f"job_{job_id}_{mode}"), job_id)
+            )
+        return job_id
+
+    def to_job(self, row) -> Dict:
+        job = dict(row)
+        for key in ("ids", "options", "checkpoint", "result"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        job["options"] = job["options"] or {}
+        return job
+
+    def list(self, status: Optional[str] = None) -> List[Dict]:
+        query = "SELECT * FROM jobs" + (" WHERE status = ?" if status else "") + " ORDER BY priority DESC, id"
+        with self.lock:
+            rows = self.connection.execute(query, (status,) if status else ()).fetchall()
+        return [self.to_job(row) for row in rows]
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        with self.lock:
+            row = self.connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self.to_job(row) if row else None
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Take the highest-priority queued job, or a running one whose worker went silent."""
+        now = time.time()
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.connection.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'running' AND heartbeat < ?) "
+                    "ORDER BY priority DESC, id LIMIT 1",
+                    (now - JOB_STALE_AFTER,)
+                ).fetchone()
+                if row is not None:
+                    self.connection.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, heartbeat = ?, attempts = attempts + 1, "
+                        "updated = ? WHERE id = ?",
+                        (worker, now, datetime.now().isoformat(timespec='seconds'), row["id"])
+                    )
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        return self.get(row["id"]) if row is not None else None
+
+    def update(self, job_id: int, **fields):
+        fields["updated"] = datetime.now().isoformat(timespec='seconds')
+        for key in ("checkpoint", "result"):
+            if key in fields and fields[key] is not None:
+                fields[key] = json.dumps(fields[key])
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self.lock:
+            self.connection.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def heartbeat(self, job_id: int):
+        # Only a running job beats; a late beat must not touch a finished or requeued one
+        with self.lock:
+            self.connection.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND status = 'running'", (time.time(), job_id)
+            )
+
+    def checkpoint(self, job_id: int, state: Dict):
+        self.update(job_id, checkpoint=state, heartbeat=time.time())
+
+    def finish(self, job_id: int, status: str, result: Dict = None, error: Optional[str] = None):
+        self.update(job_id, status=status, result=result, error=error, heartbeat=None)
+
+    def requeue(self, job_id: int):
+        # Keeps the checkpoint, so the next claim resumes where this one stopped
+        self.update(job_id, status="queued", worker=None, heartbeat=None)
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            rows = self.connection.execute("SELECT status, count(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def cancel(self, job_id: int) -> bool:
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET status = 'cancelled', updated = ? WHERE id = ? AND status = 'queued'",
+                (datetime.now().isoformat(timespec='seconds'), job_id)
+            )
+        return cursor.rowcount > 0
+
+    def reserve_request_slot(self, interval: float) -> float:
+        """Book the next free request slot and return the seconds to wait for it."""
+        now = time.time()
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.connection.execute("SELECT next_slot FROM rate_clock WHERE id = 1").fetchone()
+                slot = max(now, row[0] if row else 0)
+                self.connection.execute("INSERT OR REPLACE INTO rate_clock(id, next_slot) VALUES (1, ?)", (slot + interval,))
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        return slot - now
+
+    def close(self):
+        self.connection.close()
+
+class RateLimiter:
+    """Global request cap shared by every worker on a job queue file."""
+
+    def __init__(self, queue: JobQueue, requests_per_minute: float = DEFAULT_RATE_LIMIT):
+        self.queue = queue
+        self.interval = 60.0 / requests_per_minute
+
+    def acquire(self):
+        wait = self.queue.reserve_request_slot(self.interval)
+        if wait > 0:
+            time.sleep(wait)
+
+class RunMetrics:
+    """Live telemetry of one scraper for the status endpoint.
+
+    The scraper thread records into plain counters and latency rings and,
+    at most every METRICS_PUBLISH_INTERVAL, builds a fresh dict and swaps
+    it into `snapshot`. Readers only take that reference, so the hot path
+    never waits on a lock.
+    """
+
+    def __init__(self, name: str, stats: Dict):
+        self.name = name
+        self.stats = stats
+        self.started = time.time()
+        self.requests = deque(maxlen=METRICS_LATENCY_SAMPLES)
+        self.latencies = {}
+        self.stage = "idle"
+        self.stage_started = self.started
+        self.done = 0
+        self.total = 0
+        self.gauges = {}
+        self.last_publish = 0
+        self.snapshot = self.build_snapshot()
+
+    def record_request(self, seconds: float, success: bool):
+        self.requests.append((time.time(), success))
+        self.observe("fetch", seconds)
+
+    def observe(self, stage: str, seconds: float):
+        if stage not in self.latencies:
+            self.latencies[stage] = deque(maxlen=METRICS_LATENCY_SAMPLES)
+        self.latencies[stage].append(seconds)
+        self.maybe_publish()
+
+    def progress(self, stage: str, done: int, total: int, **gauges):
+        if stage != self.stage:
+            self.stage = stage
+            self.stage_started = time.time()
+            self.gauges = {}
+        self.done = done
+        self.total = total
+        self.gauges.update(gauges)
+        self.maybe_publish()
+
+    def maybe_publish(self):
+        now = time.time()
+        if now - self.last_publish >= METRICS_PUBLISH_INTERVAL:
+            self.last_publish = now
+            self.snapshot = self.build_snapshot()
+
+    def publish(self):
+        self.last_publish = time.time()
+        self.snapshot = self.build_snapshot()
+
+    def build_snapshot(self) -> Dict:
+        now = time.time()
+        recent = [success for timestamp, success in self.requests if timestamp >= now - METRICS_RATE_WINDOW]
+        window = min(METRICS_RATE_WINDOW, max(now - self.started, 1e-9))
+
+        stage_elapsed = now - self.stage_started
+        remaining = max(self.total - self.done, 0)
+        eta = remaining * stage_elapsed / self.done if self.done and self.total else None
+
+        latency = {}
+        for stage, samples in self.latencies.items():
+            ordered = sorted(samples)
+            latency[stage] = {"count": len(ordered)}
+            for quantile in STATUS_QUANTILES:
+                latency[stage][str(quantile)] = ordered[min(int(quantile * len(ordered)), len(ordered) - 1)] if ordered else None
+
+        return {
+            "kind": "run",
+            "name": self.name,
+            "time": datetime.now().isoformat(timespec='seconds'),
+            "uptime_seconds": round(now - self.started, 1),
+            "requests_per_second": round(len(recent) / window, 3),
+            "success_rate": round(sum(recent) / len(recent), 4) if recent else None,
+            "stage": self.stage,
+            "progress": {
+                "done": self.done,
+                "total": self.total,
+                "eta_seconds": round(eta, 1) if eta is not None else None
+            },
+            "queues": {"remaining": remaining, **{key: value for key, value in self.gauges.items() if key.endswith("queue")}},
+            "counts": {
+                **{key: value for key, value in self.stats.items() if isinstance(value, int)},
+                **{key: value for key, value in self.gauges.items() if not key.endswith("queue")}
+            },
+            "latency": latency
+        }
+
+class StatusServer:
+    """Stdlib HTTP endpoint serving the latest metric snapshots.
+
+    GET /status returns JSON and GET /metrics Prometheus text. Sources are
+    any objects with a `snapshot` dict attribute; the source table is
+    replaced rather than mutated, so handler threads read it lock-free.
+    """
+
+    def __init__(self, port: int, host: str = "127.0.0.1"):
+        self.sources = {}
+        self.server = ThreadingHTTPServer((host, port), self.make_handler())
+        self.server.daemon_threads = True
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+
+    def register(self, name: str, source):
+        self.sources = {**self.sources, name: source}
+
+    def unregister(self, name: str):
+        self.sources = {key: value for key, value in self.sources.items() if key != name}
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def collect(self) -> Dict:
+        return {name: source.snapshot for name, source in self.sources.items()}
+
+    def to_prometheus(self, snapshots: Dict) -> str:
+        # Samples of one metric must be contiguous, so lines are grouped per metric
+        families = {}
+
+        def metric(metric_name, kind, value, **labels):
+            if value is None:
+                return
+            lines = families.setdefault(metric_name, [f"# TYPE law_scraper_{metric_name} {kind}"])
+            label_text = ",".join(f'{key}="{str(label).replace(chr(34), chr(39))}"' for key, label in labels.items())
+            lines.append(f"law_scraper_{metric_name}{{{label_text}}} {value}")
+
+        for name, snapshot in snapshots.items():
+            if snapshot.get("kind") == "worker":
+                for status, count in snapshot["jobs"].items():
+                    metric("jobs", "gauge", count, source=name, status=status)
+                continue
+            metric("requests_per_second", "gauge", snapshot["requests_per_second"], source=name)
+            metric("success_ratio", "gauge", snapshot["success_rate"], source=name)
+            metric("progress_done", "gauge", snapshot["progress"]["done"], source=name, stage=snapshot["stage"])
+            metric("progress_total", "gauge", snapshot["progress"]["total"], source=name, stage=snapshot["stage"])
+            metric("eta_seconds", "gauge", snapshot["progress"]["eta_seconds"], source=name, stage=snapshot["stage"])
+            for queue, depth in snapshot["queues"].items():
+                metric("queue_depth", "gauge", depth, source=name, queue=queue)
+            for key, count in snapshot["counts"].items():
+                metric(key, "gauge", count, source=name)
+            for stage, summary in snapshot["latency"].items():
+                for quantile in STATUS_QUANTILES:
+                    metric("latency_seconds", "gauge", summary[str(quantile)], source=name, stage=stage, quantile=quantile)
+                metric("latency_samples", "gauge", summary["count"], source=name, stage=stage)
+        return "".join(line + "\n" for lines in families.values() for line in lines)
+
+    def make_handler(self):
+        status = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0].rstrip("/")
+                if path in ("", "/status"):
+                    body = json.dumps(status.collect(), indent=2).encode("utf-8")
+                    content_type = "application/json"
+                elif path == "/metrics":
+                    body = status.to_prometheus(status.collect()).encode("utf-8")
+                    content_type = "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return StatusHandler
+
+class FixtureServer:
+    """Serves the stored profile pages in debug_html as a local stand-in for the site.
+
+    Profiles answer at /americanlawyer/law-firm-profile/?id=N; IDs without a
+    stored valid profile get the stored invalid-ID page. /rankings/ links
+    every other valid fixture ID and /sitemap.xml is a sitemap index whose
+    child sitemap lists one more, so discovery has seeds and gaps to probe.
+    """
+
+    def __init__(self, pages_dir=PREFLIGHT_PAGES_DIR, port: int = 0, host: str = "127.0.0.1"):
+        self.pages = {}
+        self.invalid_page = None
+        for path in sorted(Path(pages_dir).glob("raw_response_*.txt")):
+            content = path.read_bytes()
+            if PROFILE_TITLE_MARKER in content:
+                self.pages[int(path.stem.rsplit("_", 1)[-1])] = content
+            elif self.invalid_page is None:
+                self.invalid_page = content
+        self.server = ThreadingHTTPServer((host, port), self.make_handler())
+        self.server.daemon_threads = True
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def root(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        return self.root + "/americanlawyer/law-firm-profile/?id={}"
+
+    @property
+    def seed_urls(self) -> List[str]:
+        return [self.root + "/rankings/", self.root + "/sitemap.xml"]
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def respond(self, path: str, query: str):
+        valid_ids = sorted(self.pages)
+        if path == "/americanlawyer/law-firm-profile/":
+            match = re.search(r'(?:^|&)id=(\d+)', query)
+            firm_id = int(match.group(1)) if match else None
+            body = self.pages.get(firm_id, self.invalid_page)
+            return (200, "text/html", body) if body is not None else (404, "text/plain", b"")
+        if path == "/rankings/":
+            links = "".join(
+                f'<a href="{self.base_url.format(firm_id)}">Firm {firm_id}</a>\n' for firm_id in valid_ids[::2]
+            )
+            return 200, "text/html", f"<html><body>\n{links}</body></html>".encode("utf-8")
+        if path == "/sitemap.xml":
+            body = f"<sitemapindex><sitemap><loc>{self.root}/sitemap-firms.xml</loc></sitemap></sitemapindex>"
+            return 200, "application/xml", body.encode("utf-8")
+        if path == "/sitemap-firms.xml":
+            locs = "".join(f"<url><loc>{self.base_url.format(firm_id)}</loc></url>" for firm_id in valid_ids[1:2])
+            return 200, "application/xml", f"<urlset>{locs}</urlset>".encode("utf-8")
+        return 404, "text/plain", b""
+
+    def make_handler(self):
+        fixtures = self
+
+        class FixtureHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path, _, query = self.path.partition("?")
+                status, content_type, body = fixtures.respond(path, query)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return FixtureHandler
+
 class ControlPanel:
     def __init__(self, parent_frame, main_window):
         self.main_window = main_window
@@ -403,6 +2443,8 @@ class ControlPanel:
         self.run_type = tk.StringVar(value="N")
         ttk.Radiobutton(scrape_frame, text="New", variable=self.run_type, value="N").grid(row=0, column=1)
         ttk.Radiobutton(scrape_frame, text="Restart", variable=self.run_type, value="R").grid(row=0, column=2)
+        ttk.Radiobutton(scrape_frame, text="Refresh", variable=self.run_type, value="F").grid(row=0, column=3)
+        ttk.Radiobutton(scrape_frame, text="Discover", variable=self.run_type, value="D").grid(row=0, column=4)
 
         # URL Range
         ttk.Label(scrape_frame, text="URL Range:").grid(row=1, column=0, padx=5, pady=2)
@@ -414,9 +2456,39 @@ class ControlPanel:
         self.test_count = tk.StringVar()
         ttk.Entry(scrape_frame, textvariable=self.test_count, width=10).grid(row=2, column=1, columnspan=2)
 
+        # Refresh Budget
+        ttk.Label(scrape_frame, text="Refresh Budget:").grid(row=3, column=0, padx=5, pady=2)
+        self.refresh_budget = tk.StringVar(value=str(DEFAULT_REFRESH_BUDGET))
+        ttk.Entry(scrape_frame, textvariable=self.refresh_budget, width=10).grid(row=3, column=1, columnspan=2)
+
+        # Profile URL template and discovery seeds (comma-separated; blank uses the defaults)
+        ttk.Label(scrape_frame, text="Base URL:").grid(row=4, column=0, padx=5, pady=2)
+        self.base_url = tk.StringVar(value=DEFAULT_BASE_URL)
+        ttk.Entry(scrape_frame, textvariable=self.base_url, width=40).grid(row=4, column=1, columnspan=4)
+        ttk.Label(scrape_frame, text="Seed URLs:").grid(row=5, column=0, padx=5, pady=2)
+        self.seed_urls = tk.StringVar()
+        ttk.Entry(scrape_frame, textvariable=self.seed_urls, width=40).grid(row=5, column=1, columnspan=4)
+
+        # Preflight
+        self.preflight_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(scrape_frame, text="Preflight check", variable=self.preflight_var).grid(row=6, column=0, columnspan=3)
+
+        # Columnar export, only offered when pyarrow is installed
+        self.columnar_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            scrape_frame,
+            text="Parquet export" if ColumnarExporter.available() else "Parquet export (needs pyarrow)",
+            variable=self.columnar_var,
+            state="normal" if ColumnarExporter.available() else "disabled"
+        ).grid(row=7, column=0, columnspan=3)
+
+        # Summary charts
+        self.charts_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(scrape_frame, text="Summary charts", variable=self.charts_var).grid(row=8, column=0, columnspan=3)
+
         # Start/Stop Button
         self.start_button = ttk.Button(scrape_frame, text="Start Scraping", command=self.toggle_scraping)
-        self.start_button.grid(row=3, column=0, columnspan=3, pady=10)
+        self.start_button.grid(row=9, column=0, columnspan=3, pady=10)
 
     def create_slider(self, parent, label, variable, min_val, max_val, unit, row):
         ttk.Label(parent, text=label).grid(row=row, column=0, padx=5, pady=2, sticky="w")
@@ -527,14 +2599,29 @@ class ControlPanel:
     def toggle_scraping(self):
         if not self.is_scraping:
             try:
-                range_start, range_end = map(int, self.url_range.get().split('-'))
+                # The range is optional for refresh runs, where it only filters known firms
+                if self.run_type.get() == "F" and not self.url_range.get():
+                    range_start, range_end = None, None
+                else:
+                    range_start, range_end = map(int, self.url_range.get().split('-'))
                 test_count = int(self.test_count.get()) if self.test_count.get() else None
+                refresh_budget = int(self.refresh_budget.get()) if self.refresh_budget.get() else None
+                base_url = self.base_url.get().strip() or DEFAULT_BASE_URL
+                if not is_profile_url_template(base_url):
+                    messagebox.showerror("Error", "Base URL must have an id={} query parameter where the firm ID goes")
+                    return
 
                 config = {
                     'run_type': self.run_type.get(),
                     'range_start': range_start,
                     'range_end': range_end,
-                    'test_count': test_count
+                    'test_count': test_count,
+                    'refresh_budget': refresh_budget,
+                    'base_url': base_url,
+                    'seed_urls': [url.strip() for url in self.seed_urls.get().split(",") if url.strip()] or None,
+                    'preflight': self.preflight_var.get(),
+                    'columnar': "parquet" if self.columnar_var.get() else None,
+                    'summary_charts': self.charts_var.get()
                 }
 
                 self.is_scraping = True
@@ -654,7 +2741,7 @@ class GraphPanel:
 
 class LawScraper:
     def __init__(self, debug_manager, stealth_manager, status_callback):
-        self.BASE_URL = "https://www.law.com/americanlawyer/law-firm-profile/?id={}"
+        self.BASE_URL = DEFAULT_BASE_URL
         self.save_directory = None
         self.debug_manager = debug_manager
         self.stealth_manager = stealth_manager
@@ -671,14 +2758,70 @@ class LawScraper:
             'successful_requests': 0,
             'failed_requests': 0,
             'total_time': 0,
-            'start_time': None
+            'start_time': None,
+            'pages_parsed': 0,
+            'pages_unchanged': 0,
+            'cache_hits': 0,
+            'cache_revalidated': 0,
+            'cache_misses': 0,
+            'bytes_downloaded': 0,
+            'pages_stopped_early': 0
         }
 
+        # Body of the last valid profile seen by check_url, used to harvest links
+        self.last_page = None
+        self.last_from_cache = False
+
+        # Rank/revenue/headcount indexes over all known firms, built in initialize()
+        self.result_index = ResultIndex()
+
+        # Live telemetry read by the status endpoint
+        self.metrics = RunMetrics("scraper", self.stats)
+
+        # Shared request cap when running under a job worker
+        self.rate_limiter = None
+
+        # Crawl checkpoint file, set in initialize() and overridden per job
+        self.progress_file = None
+
+        # Set when the coverage monitor stops a run
+        self.halt_reason = None
+
+        # Called with each extracted record, e.g. to feed the live results table
+        self.record_callback = None
+
+        # Parquet/Feather export of each run's records when set (needs pyarrow)
+        self.columnar_format = None
+
+        # Also render PNG charts next to the summary report
+        self.summary_charts = False
+
+        # Per-year survey ranks of every parsed firm, opened in initialize()
+        self.rank_history = None
+
+        # Full-text index over names and descriptions, opened in initialize()
+        self.search_index = None
+
+        # Conditional-request cache of page bodies, created in initialize()
+        self.http_cache = None
+
+        # Fingerprints of the previous run, loaded in initialize()
+        self.snapshot = None
+
+        # ID range covered by the current crawl, used for removal detection
+        self.crawl_scope = None
+
+        # Failed crawl requests waiting for another attempt
+        self.crawl_retries = RetryQueue()
+
         # Setup logger
         self.logger = self.setup_logger()
 
     def setup_logger(self):
         logger = logging.getLogger('LawScraper')
+        # Workers build a scraper per job; they all share the first run's log file
+        if logger.handlers:
+            return logger
         logger.setLevel(logging.INFO)
 
         # Create logs directory
@@ -696,97 +2839,208 @@ class LawScraper:
     def initialize(self, save_directory):
         self.save_directory = Path(save_directory)
         self.save_directory.mkdir(exist_ok=True)
+        self.progress_file = self.save_directory / 'crawler_progress.json'
+        self.snapshot = SnapshotStore(self.save_directory / 'firm_snapshot.json')
+        self.http_cache = HttpCache(self.save_directory / 'http_cache')
+        self.result_index = ResultIndex.from_snapshot(self.snapshot.path)
+        self.rank_history = RankHistoryStore(self.save_directory / RANK_HISTORY_DIR)
+        self.search_index = SearchIndex(self.save_directory / 'search.db')
+        if self.search_index.count() == 0 and len(self.result_index):
+            self.search_index.add_many(self.result_index.snapshot().values())
 
         self.logger.info("Starting scraper with direct connection mode")
         self.logger.info(f"Save directory: {self.save_directory}")
         self.logger.info(f"Stealth level: {self.stealth_manager.current_level}")
 
+    def fetch(self, url, headers=None, profile=True, use_cache=True):
+        """GET a page, raising FetchError with a retry class on failure.
+
+        Pages still fresh in the HTTP cache are returned without a request;
+        stale entries are revalidated with If-None-Match/If-Modified-Since.
+        Profile pages are streamed and the connection is released as soon
+        as the profile block (or the invalid-ID page) has been recognised.
+        """
+        cached = self.http_cache.lookup(url) if self.http_cache and use_cache else None
+        if cached and self.http_cache.is_fresh(cached):
+            self.stats['cache_hits'] += 1
+            return self.http_cache.load(url, cached)
+
+        headers = dict(headers or {})
+        if cached:
+            headers.update(self.http_cache.conditional_headers(cached))
+
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        self.stats['requests_made'] += 1
+        started = time.time()
+        try:
+            response = self.session.get(url, headers=headers, timeout=10, stream=True)
+            try:
+                scanner = ProfileStreamScanner(scan=profile)
+                if response.status_code == 200:
+                    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                        if scanner.feed(chunk):
+                            self.stats['pages_stopped_early'] += 1
+                            break
+                    content = bytes(scanner.buffer)
+                else:
+                    content = response.content
+            finally:
+                response.close()
+        except requests.RequestException as e:
+            self.metrics.record_request(time.time() - started, False)
+            if isinstance(e, requests.Timeout):
+                raise FetchError("timeout", str(e)) from e
+            if isinstance(e, (requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError)):
+                raise FetchError("truncated", str(e)) from e
+            raise FetchError("connection", str(e)) from e
+
+        self.metrics.record_request(time.time() - started, response.status_code < 400)
+        self.stats['bytes_downloaded'] += len(content)
+        response = PageResponse(url, response.status_code, content, response.headers)
+
+        if response.status_code == 304 and cached:
+            self.stats['cache_revalidated'] += 1
+            self.http_cache.refresh(url, cached, response)
+            revalidated = self.http_cache.load(url, cached)
+            # The body is cached but a request was still made, so pacing applies
+            revalidated.from_cache = False
+            return revalidated
+
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After")
+            raise FetchError(
+                "rate_limit",
+                "Rate limit detected",
+                response.status_code,
+                float(retry_after) if retry_after and retry_after.isdigit() else None
+            )
+
+        if response.status_code >= 500:
+            raise FetchError("server_error", f"Server error {response.status_code}", response.status_code)
+
+        if (profile and response.status_code == 200 and scanner.state == "reading"
+                and b"</html>" not in response.content[-1024:].lower()):
+            raise FetchError(
+                "truncated",
+                f"Incomplete body ({len(response.content)} bytes)",
+                response.status_code
+            )
+
+        if self.http_cache and use_cache and response.status_code == 200:
+            self.stats['cache_misses'] += 1
+            self.http_cache.store(url, response)
+
+        return response
+
+    def schedule_retry(self, retry_queue, key, url, error):
+        if retry_queue.schedule(key, url, error):
+            self.logger.warning(f"{error.failure_class} for {url}: {error} - scheduled for retry")
+        else:
+            self.logger.error(f"{error.failure_class} for {url}: {error} - retries exhausted, moved to dead letters")
+
+    def iter_with_retries(self, items, retry_queue):
+        # Due retries are interleaved ahead of fresh items; once fresh items
+        # run out, wait for the remaining retries to come due.
+        for item in items:
+            while self.is_running:
+                due = retry_queue.pop_due()
+                if due is None:
+                    break
+                yield due
+            yield item
+
+        while self.is_running and len(retry_queue):
+            due = retry_queue.pop_due()
+            if due is None:
+                time.sleep(min(retry_queue.seconds_until_next(), 1))
+                continue
+            yield due
+
     def check_url(self, id):
         url = self.BASE_URL.format(id)
         self.logger.info(f"Attempting request to {url}")
+        self.last_from_cache = False
 
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1'
+        }
 
-            response = requests.get(url, headers=headers, timeout=10)
-            self.logger.info(f"Response status code: {response.status_code}")
+        try:
+            response = self.fetch(url, headers=headers)
+        except FetchError as e:
+            self.logger.error(f"Request failed: {str(e)}")
+            self.update_success_metrics(False)
+            raise
 
-            if response.status_code == 200:
-                # Save raw response content
-                debug_dir = Path("debug_html")
-                debug_dir.mkdir(exist_ok=True)
+        self.last_from_cache = response.from_cache
+        self.logger.info(f"Response status code: {response.status_code}")
 
-                # Save raw response
-                with open(debug_dir / f"raw_response_{id}.txt", "wb") as f:
-                    f.write(response.content)
+        if response.status_code == 200:
+            # Save raw response content under the run's directory: bodies are
+            # usually cut short by the stream scanner and must not overwrite
+            # the full pages kept in PREFLIGHT_PAGES_DIR
+            debug_dir = self.save_directory / "debug_html"
+            debug_dir.mkdir(exist_ok=True)
 
-                # Try to decode and save as text
-                try:
-                    content = response.content.decode('utf-8')
-                    with open(debug_dir / f"decoded_response_{id}.html", "w", encoding='utf-8') as f:
-                        f.write(content)
-                except UnicodeDecodeError:
-                    self.logger.warning("Could not decode response as UTF-8")
-
-                # Log first 1000 characters of content
-                self.logger.info(f"First 1000 chars of response: {str(response.content[:1000])}")
-
-                # Check for key HTML patterns
-                patterns_to_check = [
-                    '<h1 class="page-title left"',
-                    'class="overview-title"',
-                    'class="survey-name-firms"',
-                    'class="firms-para"'
-                ]
-
-                for pattern in patterns_to_check:
-                    if pattern in str(response.content):
-                        self.logger.info(f"Found pattern: {pattern}")
-                    else:
-                        self.logger.warning(f"Missing pattern: {pattern}")
-
-                # Continue with normal processing
-                soup = BeautifulSoup(response.content, "html.parser")
-                firm_name = soup.find("h1", class_="page-title left")
-
-                if firm_name:
-                    self.stats['successful_requests'] += 1
-                    self.update_success_metrics(True)
-                    return url
+            # Save raw response
+            with open(debug_dir / f"raw_response_{id}.txt", "wb") as f:
+                f.write(response.content)
+
+            # Decode and save as text; a cut-short body can end mid-character
+            content = response.content.decode('utf-8', errors='replace')
+            with open(debug_dir / f"decoded_response_{id}.html", "w", encoding='utf-8') as f:
+                f.write(content)
+
+            # Log first 1000 characters of content
+            self.logger.info(f"First 1000 chars of response: {str(response.content[:1000])}")
+
+            # Check for key HTML patterns
+            patterns_to_check = [
+                '<h1 class="page-title left"',
+                'class="overview-title"',
+                'class="survey-name-firms"',
+                'class="firms-para"'
+            ]
+
+            for pattern in patterns_to_check:
+                if pattern in str(response.content):
+                    self.logger.info(f"Found pattern: {pattern}")
                 else:
-                    self.logger.warning("No firm name found in parsed content")
-                    # Log all h1 tags found
-                    h1s = soup.find_all("h1")
-                    if h1s:
-                        self.logger.info(f"Found {len(h1s)} h1 tags: {[str(h1) for h1 in h1s]}")
-
-            elif response.status_code == 429:
-                self.logger.warning("Rate limit detected")
-                time.sleep(60)
-                return None
+                    self.logger.warning(f"Missing pattern: {pattern}")
 
-            self.update_success_metrics(False)
-            return None
+            # Continue with normal processing
+            soup = BeautifulSoup(response.content, "html.parser")
+            firm_name = soup.find("h1", class_="page-title left")
 
-        except requests.RequestException as e:
-            self.logger.error(f"Request failed: {str(e)}")
-            self.update_success_metrics(False)
-            return None
+            if firm_name:
+                self.last_page = response.content
+                self.update_success_metrics(True)
+                return url
+            else:
+                self.logger.warning("No firm name found in parsed content")
+                # Log all h1 tags found
+                h1s = soup.find_all("h1")
+                if h1s:
+                    self.logger.info(f"Found {len(h1s)} h1 tags: {[str(h1) for h1 in h1s]}")
+
+        self.update_success_metrics(False)
+        return None
 
     def update_success_metrics(self, success):
-        self.stats['requests_made'] += 1
+        # requests_made is counted in fetch; these track crawl checks only
         if success:
             self.stats['successful_requests'] += 1
         else:
             self.stats['failed_requests'] += 1
 
-        success_rate = (self.stats['successful_requests'] / self.stats['requests_made']) * 100
+        checks = self.stats['successful_requests'] + self.stats['failed_requests']
+        success_rate = (self.stats['successful_requests'] / checks) * 100
         self.status_callback(f"Success Rate: {success_rate:.1f}%")
 
         if self.debug_manager.enabled:
@@ -798,6 +3052,70 @@ class LawScraper:
         self.status_callback(f"Cooling down for {cooldown_time/60:.1f} minutes...")
         time.sleep(cooldown_time)
 
+    def run_preflight(self, use_stored_pages=False):
+        """Extract a few known-good profiles and check field coverage.
+
+        Live pages bypass the HTTP cache so layout changes are seen. Returns
+        (passed, report); the report is also written to preflight_report.json.
+        """
+        pages = []
+        if use_stored_pages:
+            for path in sorted(Path(PREFLIGHT_PAGES_DIR).glob("raw_response_*.txt")):
+                firm_id = int(path.stem.rsplit("_", 1)[-1])
+                if firm_id in PREFLIGHT_IDS:
+                    pages.append((self.BASE_URL.format(firm_id), path.read_bytes()))
+        else:
+            for position, firm_id in enumerate(PREFLIGHT_IDS):
+                # Canaries are uncached live requests, so pace them like any other
+                if position:
+                    time.sleep(self.stealth_manager.get_delay())
+                url = self.BASE_URL.format(firm_id)
+                try:
+                    pages.append((url, self.fetch(url, use_cache=False).content))
+                except FetchError as e:
+                    self.logger.warning(f"Preflight fetch of {url} failed: {e}")
+
+        found = dict.fromkeys(FIELD_COVERAGE_THRESHOLDS, 0)
+        for url, content in pages:
+            record = self.extract_firm_data(BeautifulSoup(content, "html.parser"), url)
+            for column in found:
+                found[column] += getattr(record, FIRM_FIELDS[column]) is not None
+
+        coverage = {column: (count / len(pages) if pages else 0) for column, count in found.items()}
+        failing = [column for column, rate in coverage.items() if rate < FIELD_COVERAGE_THRESHOLDS[column]]
+        report = {
+            "time": datetime.now().isoformat(timespec='seconds'),
+            "source": "stored" if use_stored_pages else "live",
+            "pages": len(pages),
+            "coverage": coverage,
+            "failing_fields": failing,
+            "passed": bool(pages) and not failing
+        }
+
+        if self.save_directory:
+            with open(self.save_directory / 'preflight_report.json', 'w') as f:
+                json.dump(report, f, indent=4)
+
+        if report["passed"]:
+            self.logger.info(f"Preflight passed on {len(pages)} pages")
+        else:
+            self.logger.error(f"Preflight failed on {len(pages)} pages; low coverage: {', '.join(failing) or 'no pages'}")
+        return report["passed"], report
+
+    def plan_refresh(self, config, progress_window):
+        """Return the URLs of the firms most in need of a refetch."""
+        self.is_running = True
+        self.stats['start_time'] = time.time()
+        self.crawl_scope = None
+
+        budget = config.get('refresh_budget') or DEFAULT_REFRESH_BUDGET
+        id_range = (config['range_start'], config['range_end']) if config.get('range_start') is not None else None
+
+        urls = RefreshScheduler(self.snapshot).select(budget, id_range)
+        self.logger.info(f"Refresh selected {len(urls)} of {len(self.snapshot.previous)} known firms (budget {budget})")
+        progress_window.update_crawler(100, f"Refresh planned: {len(urls)} firms")
+        return urls
+
     def crawl_ids(self, config, progress_window):
         self.is_running = True
         self.stats['start_time'] = time.time()
@@ -807,59 +3125,186 @@ class LawScraper:
             return []
 
         max_id = config['test_count'] if config['test_count'] else config['range_end']
+        self.crawl_scope = (config['range_start'], max_id)
         total_remaining = max_id - last_id + 1
         processed = 0
 
         # Special handling for test mode
         is_test_mode = bool(config['test_count'])
-        if is_test_mode:
-            delay_range = (1, 3)  # 1-3 seconds delay in test mode
-            self.logger.info("Running in test mode with shortened delays")
-        else:
-            current_level = self.stealth_manager.current_level
-            delay_range = (
-                STEALTH_LEVELS[current_level]["min_delay"],
-                STEALTH_LEVELS[current_level]["max_delay"]
-            )
+        delay_range = self.get_delay_range(is_test_mode)
 
         self.logger.info(f"Starting crawl from ID {last_id} to {max_id}")
+        highest_id = last_id
 
-        for current_id in range(last_id, max_id + 1):
+        for current_id in self.iter_with_retries(range(last_id, max_id + 1), self.crawl_retries):
             if not self.is_running:
                 break
 
             processed += 1
-            percentage = (processed / total_remaining) * 100
+            highest_id = max(highest_id, current_id)
+            percentage = min((processed / (total_remaining + self.crawl_retries.total_scheduled)) * 100, 100)
 
+            self.metrics.progress(
+                "crawl", processed, total_remaining + self.crawl_retries.total_scheduled,
+                retry_queue=len(self.crawl_retries), dead_letters=len(self.crawl_retries.dead_letters),
+                found=len(discovered_urls)
+            )
             self.logger.info(f"Checking ID: {current_id} ({percentage:.1f}% complete)")
             progress_window.update_crawler(percentage, f"Checking ID: {current_id}")
 
             try:
                 url = self.check_url(current_id)
+                self.crawl_retries.resolve(current_id)
                 if url:
                     discovered_urls.add(url)
                     self.logger.info(f"Found valid URL for ID {current_id}: {url}")
                 else:
                     self.logger.info(f"No valid URL found for ID {current_id}")
+            except FetchError as e:
+                self.schedule_retry(self.crawl_retries, current_id, self.BASE_URL.format(current_id), e)
             except Exception as e:
                 self.logger.error(f"Error checking ID {current_id}: {str(e)}")
 
-            # Add a small delay between requests
-            delay = random.uniform(*delay_range)
-            self.logger.info(f"Waiting {delay:.1f} seconds before next request")
-            time.sleep(delay)
+            # Add a small delay between requests; cache hits never reached the site
+            if not self.last_from_cache:
+                delay = random.uniform(*delay_range)
+                self.logger.info(f"Waiting {delay:.1f} seconds before next request")
+                time.sleep(delay)
 
-            # Save progress every 5 requests in test mode
-            if is_test_mode and processed % 5 == 0:
-                self.save_progress(current_id, discovered_urls)
+            # Save progress every 5 requests in test mode, every 25 otherwise
+            if processed % (5 if is_test_mode else 25) == 0:
+                self.save_progress(highest_id, discovered_urls)
                 self.logger.info(f"Saved progress after {processed} requests")
 
+        if not self.is_running:
+            # Stopped early: IDs past the stop point were never checked, so none of them count as removed
+            self.crawl_scope = (config['range_start'], highest_id) if processed else None
+
         self.save_progress(max_id, discovered_urls)
+        if self.crawl_retries.dead_letters:
+            self.crawl_retries.save_dead_letters(self.save_directory / 'crawler_dead_letter.json')
+            self.logger.warning(f"{len(self.crawl_retries.dead_letters)} IDs exhausted their retries")
+
         progress_window.update_crawler(100, "Crawling complete!")
         return list(discovered_urls)
 
+    def get_delay_range(self, is_test_mode):
+        if is_test_mode:
+            self.logger.info("Running in test mode with shortened delays")
+            return (1, 3)  # 1-3 seconds delay in test mode
+
+        current_level = self.stealth_manager.current_level
+        return (
+            STEALTH_LEVELS[current_level]["min_delay"],
+            STEALTH_LEVELS[current_level]["max_delay"]
+        )
+
+    def discover_ids(self, config, progress_window):
+        """Seed valid IDs from listing pages, then probe only promising gaps."""
+        self.is_running = True
+        self.stats['start_time'] = time.time()
+        self.crawl_retries = RetryQueue()
+
+        max_id = config['test_count'] if config['test_count'] else config['range_end']
+        self.crawl_scope = (config['range_start'], max_id)
+        delay_range = config.get('delay_range') or self.get_delay_range(bool(config['test_count']))
+
+        state_file = self.save_directory / 'discovery_state.json'
+        state = {"valid": [], "invalid": []}
+        if state_file.exists() and config['run_type'] != 'N':
+            with open(state_file) as f:
+                state = json.load(f)
+
+        in_range = lambda firm_id: config['range_start'] <= firm_id <= max_id
+        valid_ids = set(state["valid"])
+        valid_ids.update(int(firm_id) for firm_id in self.snapshot.previous)
+
+        progress_window.update_crawler(0, "Fetching discovery seeds...")
+        valid_ids.update(self.fetch_seed_ids(config.get('seed_urls') or DISCOVERY_SEED_URLS))
+        self.logger.info(f"Discovery seeded with {len(valid_ids)} known firm IDs")
+
+        planner = DiscoveryPlanner(
+            (config['range_start'], max_id),
+            [firm_id for firm_id in valid_ids if in_range(firm_id)],
+            [firm_id for firm_id in state["invalid"] if in_range(firm_id)]
+        )
+        probe_budget = config.get('probe_budget')
+        probes = hits = 0
+
+        for current_id in self.iter_with_retries(planner.candidates(probe_budget), self.crawl_retries):
+            if not self.is_running:
+                break
+
+            probes += 1
+            self.metrics.progress(
+                "discover", probes, probe_budget or 0,
+                retry_queue=len(self.crawl_retries), found=len(valid_ids), hits=hits
+            )
+            progress_window.update_crawler(
+                min((probes / probe_budget) * 100, 100) if probe_budget else 0,
+                f"Probing ID: {current_id} ({hits} hits / {probes} probes)"
+            )
+
+            try:
+                is_valid = self.check_url(current_id)
+                self.crawl_retries.resolve(current_id)
+
+                if is_valid:
+                    hits += 1
+                    planner.add_valid(current_id)
+                    valid_ids.add(current_id)
+
+                    # Profiles link to other firms; every linked ID is free knowledge
+                    for linked_id in extract_profile_ids(self.last_page) - valid_ids:
+                        valid_ids.add(linked_id)
+                        if in_range(linked_id):
+                            planner.add_valid(linked_id)
+                else:
+                    planner.add_invalid(current_id)
+            except FetchError as e:
+                self.schedule_retry(self.crawl_retries, current_id, self.BASE_URL.format(current_id), e)
+
+            if not self.last_from_cache:
+                time.sleep(random.uniform(*delay_range))
+
+        invalid_ids = sorted(set(planner.probed) - set(planner.valid))
+        with open(state_file, 'w') as f:
+            json.dump({"valid": sorted(valid_ids), "invalid": invalid_ids}, f)
+
+        self.logger.info(f"Discovery probed {probes} IDs with {hits} hits; {len(valid_ids)} valid IDs known")
+        progress_window.update_crawler(100, "Discovery complete!")
+        return [self.BASE_URL.format(firm_id) for firm_id in sorted(valid_ids) if in_range(firm_id)]
+
+    def fetch_seed_ids(self, seed_urls, max_sitemaps: int = 50) -> Set[int]:
+        found = set()
+        pending = list(seed_urls)
+        fetched = 0
+
+        while pending and fetched < len(seed_urls) + max_sitemaps and self.is_running:
+            url = pending.pop(0)
+            fetched += 1
+            try:
+                response = self.fetch(url, profile=False)
+            except FetchError as e:
+                self.logger.warning(f"Discovery seed {url} failed: {e}")
+                continue
+            if response.status_code != 200:
+                self.logger.warning(f"Discovery seed {url} returned {response.status_code}")
+                continue
+
+            ids = extract_profile_ids(response.content)
+            self.logger.info(f"Discovery seed {url} linked {len(ids)} firm IDs")
+            found.update(ids)
+
+            # Sitemap indexes point at further sitemaps
+            if b"<sitemapindex" in response.content[:2048]:
+                pending.extend(loc.decode("utf-8") for loc in SITEMAP_LOC_PATTERN.findall(response.content))
+
+        return found
+
     def initialize_crawler(self, config):
-        progress_file = self.save_directory / 'crawler_progress.json'
+        progress_file = self.progress_file
+        self.crawl_retries = RetryQueue()
 
         if config['run_type'] == 'N':
             last_id = config['range_start']
@@ -872,6 +3317,7 @@ class LawScraper:
                     progress = json.load(f)
                     last_id = progress["last_id"]
                     discovered_urls = set(progress["discovered_urls"])
+                    self.crawl_retries.load_state(progress.get("retries", {}))
 
                     if last_id > config['range_end']:
                         messagebox.showwarning(
@@ -886,138 +3332,215 @@ class LawScraper:
         return last_id, discovered_urls
 
     def save_progress(self, last_id, discovered_urls):
-        progress_file = self.save_directory / 'crawler_progress.json'
-        with open(progress_file, 'w') as f:
+        with open(self.progress_file, 'w') as f:
             json.dump({
                 "last_id": last_id,
-                "discovered_urls": list(discovered_urls)
+                "discovered_urls": list(discovered_urls),
+                "retries": self.crawl_retries.to_state()
             }, f)
 
-    def scrape_data(self, discovered_urls, output_file, progress_window):
-        all_data = []
-        failed_urls = []
+    def cached_page(self, url) -> PageResponse:
+        entry = self.http_cache.lookup(url)
+        if entry is None:
+            raise FetchError("not_cached", "No cached copy of the page")
+        self.stats['cache_hits'] += 1
+        return self.http_cache.load(url, entry)
+
+    def scrape_data(self, discovered_urls, output_file, progress_window, offline=False):
+        """Fetch and extract each URL, streaming records into the workbook.
+
+        With offline=True pages come from the HTTP cache regardless of age
+        and are always re-extracted, to apply extractor changes without
+        refetching.
+        """
+        writer = StreamingExcelWriter(f"{output_file}.xlsx")
+        writer.create_sheet("Data", FIRM_COLUMNS)
+        success_count = 0
+        retries = RetryQueue()
+        monitor = CoverageMonitor()
+        self.halt_reason = None
+        columnar = self.open_columnar_export()
+        processed = 0
 
-        for i, url in enumerate(discovered_urls):
-            if not progress_window.is_running:
+        for url in self.iter_with_retries(discovered_urls, retries):
+            if not self.is_running:
                 break
+            response = None
 
-            percentage = (i / len(discovered_urls)) * 100
+            percentage = min((processed / (len(discovered_urls) + retries.total_scheduled)) * 100, 100)
+            processed += 1
+            self.metrics.progress(
+                "scrape", processed, len(discovered_urls) + retries.total_scheduled,
+                retry_queue=len(retries), dead_letters=len(retries.dead_letters), records=success_count
+            )
             try:
-                response = requests.get(url, timeout=10)
-                soup = BeautifulSoup(response.content, "html.parser")
-
-                data = {
-                    "URL": url,
-                    "Firm Name": None,
-                    "Am Law 200 Ranking": None,
-                    "NLJ 500 Ranking": None,
-                    "Equity Partners": None,
-                    "Non-Equity Partners": None,
-                    "Total Revenue": None,
-                    "Profit Per Equity Partner": None,
-                    "Revenue Per Lawyer": None,
-                    "Total Headcount": None,
-                    "Firm Description": None
-                }
-
-                try:
-                    data["Firm Name"] = soup.find("h1", class_="page-title left").text.strip()
-                except AttributeError:
-                    pass
-
-                try:
-                    am_law_section = soup.find("p", string="Am Law 200").find_parent("div", class_="rankings")
-                    am_law_2024 = am_law_section.find("p", class_="date-firms", string="2024").find_next_sibling("p", class_="rank-firms")
-                    data["Am Law 200 Ranking"] = am_law_2024.text.strip().replace("#", "")
-                except AttributeError:
-                    pass
-
-                try:
-                    nlj_500_section = soup.find("p", string="NLJ 500").find_parent("div", class_="rankings")
-                    nlj_500_2024 = nlj_500_section.find("p", class_="date-firms", string="2024").find_next_sibling("p", class_="rank-firms")
-                    data["NLJ 500 Ranking"] = nlj_500_2024.text.strip().replace("#", "")
-                except AttributeError:
-                    pass
-
-                metrics = {
-                    "Equity Partners": "Equity Partners:",
-                    "Non-Equity Partners": "Non-Equity Partners:",
-                    "Total Revenue": "Total Revenue:",
-                    "Profit Per Equity Partner": "Profit Per Equity Partner:",
-                    "Revenue Per Lawyer": "Revenue Per Lawyer:",
-                    "Total Headcount": "Total Headcount*:"
-                }
-
-                for key, label in metrics.items():
-                    try:
-                        data[key] = soup.find("p", string=label).find_next("div").text.strip()
-                    except AttributeError:
-                        pass
+                response = self.cached_page(url) if offline else self.fetch(url)
+                body_hash = content_fingerprint(response.content)
+                record = None if offline else self.snapshot.cached_record(firm_id_from_url(url), body_hash, url)
 
-                # Get Firm Description
-                try:
-                    data["Firm Description"] = soup.find("p", class_="firms-para").text.strip()
-                except AttributeError:
-                    pass
-
-                all_data.append(data)
-                progress_window.update_scraper(percentage, f"Scraping: {data['Firm Name'] or 'Unknown Firm'}")
-
-            except requests.RequestException as e:
-                failed_urls.append((url, str(e)))
+                if record is not None:
+                    self.stats['pages_unchanged'] += 1
+                else:
+                    started = time.time()
+                    soup = BeautifulSoup(response.content, "html.parser")
+                    record = self.extract_firm_data(soup, url)
+                    self.metrics.observe("parse", time.time() - started)
+                    self.stats['pages_parsed'] += 1
+
+                    monitor.observe(record)
+                    if monitor.collapsed():
+                        self.halt_reason = (
+                            f"Extraction coverage fell to {monitor.rate() * 100:.0f}% over the last "
+                            f"{COVERAGE_WINDOW} pages; the page layout may have changed"
+                        )
+                        self.logger.error(self.halt_reason)
+                        self.status_callback(self.halt_reason)
+                        self.is_running = False
+
+                    if record.firm_name is None:
+                        # Don't let the retry be served the same unparseable body
+                        if not offline:
+                            self.http_cache.evict(url)
+                        raise FetchError("parse", "Firm name not found in profile page", response.status_code)
+
+                    if record.firm_id is not None:
+                        self.rank_history.update(record.firm_id, extract_rank_history(soup))
+
+                self.snapshot.update(record, body_hash)
+                self.result_index.add(record)
+                self.search_index.add(record)
+                if self.record_callback:
+                    self.record_callback(record)
+
+                retries.resolve(url)
+                writer.append("Data", record)
+                if columnar:
+                    columnar.append(record)
+                success_count += 1
+                progress_window.update_scraper(percentage, f"Scraping: {record.firm_name}")
+
+            except FetchError as e:
+                self.schedule_retry(retries, url, url, e)
                 progress_window.update_scraper(percentage, f"Error: {str(e)[:30]}...")
 
-            time.sleep(random.uniform(self.MIN_DELAY, self.MAX_DELAY))
-
-        df = pd.DataFrame(all_data)
-        output_path = f"{output_file}.xlsx"
-        df.to_excel(output_path, index=False)
+            if not offline and not (response is not None and response.from_cache):
+                time.sleep(self.stealth_manager.get_delay())
 
+        failed_urls = self.dead_letter_rows(retries.dead_letters)
         if failed_urls:
-            failed_df = pd.DataFrame(failed_urls, columns=["URL", "Error"])
-            failed_output_path = f"{output_file}_failed.xlsx"
-            failed_df.to_excel(failed_output_path, index=False)
+            writer.write_sheet("Failed", FAILED_COLUMNS, failed_urls)
+        writer.write_sheet("Summary", ["Metric", "Value"], self.run_summary(success_count, len(failed_urls)))
+        writer.save()
 
+        if failed_urls:
+            failed_writer = StreamingExcelWriter(f"{output_file}_failed.xlsx")
+            failed_writer.write_sheet("Failed", FAILED_COLUMNS, failed_urls)
+            failed_writer.save()
+            retries.save_dead_letters(f"{output_file}_dead_letter.json")
+
+        if columnar:
+            self.logger.info(f"Columnar export: {columnar.close()} rows in {columnar.partition}")
+        base_hash = SummaryReport.dataset_hash(self.snapshot.previous)
+        delta = self.save_delta(discovered_urls, output_file)
+        self.write_summary(output_file, delta, base_hash)
+        self.rank_history.save()
+        self.search_index.commit()
+
+        self.metrics.progress("done", success_count, success_count + len(failed_urls))
+        self.metrics.publish()
         progress_window.update_scraper(100, "Scraping complete!")
-        return len(all_data), len(failed_urls)
-
-    def extract_firm_data(self, soup, url):
-        data = {
-            "URL": url,
-            "Firm Name": None,
-            "Am Law 200 Ranking": None,
-            "NLJ 500 Ranking": None,
-            "Equity Partners": None,
-            "Non-Equity Partners": None,
-            "Total Revenue": None,
-            "Profit Per Equity Partner": None,
-            "Revenue Per Lawyer": None,
-            "Total Headcount": None,
-            "Firm Description": None
-        }
+        return success_count, len(failed_urls)
+
+    def open_columnar_export(self) -> Optional[ColumnarExporter]:
+        if not self.columnar_format:
+            return None
+        if not ColumnarExporter.available():
+            self.logger.warning("pyarrow is not installed; skipping columnar export")
+            return None
+        return ColumnarExporter(self.save_directory / COLUMNAR_DIR, self.columnar_format)
+
+    def save_delta(self, discovered_urls, output_file):
+        # Firms that failed or were still awaiting a retry this run are treated as still present
+        seen_ids = {firm_id_from_url(url) for url in discovered_urls}
+        seen_ids.update(entry["key"] for entry in self.crawl_retries.dead_letters)
+        seen_ids.update(self.crawl_retries.pending())
+
+        delta = self.snapshot.compute_delta(seen_ids, self.crawl_scope)
+        with open(f"{output_file}_delta.json", "w") as f:
+            json.dump(delta, f, indent=4)
+        self.snapshot.save()
+
+        self.logger.info(
+            f"Delta: {len(delta['new'])} new, {len(delta['changed'])} changed, "
+            f"{len(delta['removed'])} removed, {delta['unchanged']} unchanged"
+        )
+        return delta
+
+    def write_summary(self, output_file, delta=None, base_hash=None):
+        report = SummaryReport(self.save_directory)
+        summary = report.update(self.snapshot.previous, delta, base_hash)
+        report.write(summary, output_file)
+        if self.summary_charts:
+            report.write_charts(summary, output_file)
+        self.logger.info(f"Summary of {summary['firms']} firms ({report.source})")
+        return summary
+
+    def cache_hit_rate(self) -> float:
+        hits = self.stats['cache_hits'] + self.stats['cache_revalidated']
+        lookups = hits + self.stats['cache_misses']
+        return (hits / lookups) * 100 if lookups else 0
+
+    def run_summary(self, success_count, fail_count):
+        elapsed = time.time() - self.stats['start_time'] if self.stats['start_time'] else 0
+        return [
+            ("Records", success_count),
+            ("Failed", fail_count),
+            ("Requests Made", self.stats['requests_made']),
+            ("Successful Requests", self.stats['successful_requests']),
+            ("Failed Requests", self.stats['failed_requests']),
+            ("Pages Parsed", self.stats['pages_parsed']),
+            ("Pages Unchanged", self.stats['pages_unchanged']),
+            ("Halted", self.halt_reason or ""),
+            ("Cache Hit Rate", f"{self.cache_hit_rate():.1f}%"),
+            ("Bytes Downloaded", self.stats['bytes_downloaded']),
+            ("Pages Stopped Early", self.stats['pages_stopped_early']),
+            ("Elapsed Seconds", round(elapsed, 1)),
+            ("Completed", datetime.now().isoformat(timespec='seconds'))
+        ]
+
+    def dead_letter_rows(self, dead_letters):
+        return [
+            (entry["url"], entry["last_error"], entry["failure_class"], entry["attempts"])
+            for entry in dead_letters
+        ]
+
+    def extract_firm_data(self, soup, url) -> FirmRecord:
+        data = dict.fromkeys(FIRM_COLUMNS)
+        data["URL"] = url
 
         try:
-            # Debug: Print all classes in the HTML
-            all_classes = [elem.get('class', []) for elem in soup.find_all(class_=True)]
-            self.logger.info(f"Found classes in HTML: {set([c for classes in all_classes for c in classes])}")
+            if self.debug_manager.enabled:
+                # Debug: Print all classes in the HTML
+                all_classes = [elem.get('class', []) for elem in soup.find_all(class_=True)]
+                self.logger.info(f"Found classes in HTML: {set([c for classes in all_classes for c in classes])}")
 
-            # Debug: Check for overview-title elements
-            overview_titles = soup.find_all("p", class_="overview-title")
-            self.logger.info(f"Found overview titles: {[t.text for t in overview_titles]}")
+                # Debug: Check for overview-title elements
+                overview_titles = soup.find_all("p", class_="overview-title")
+                self.logger.info(f"Found overview titles: {[t.text for t in overview_titles]}")
 
-            # Debug: Check for rankings elements
-            rankings = soup.find_all("div", class_="rankings")
-            self.logger.info(f"Found {len(rankings)} rankings divs")
+                # Debug: Check for rankings elements
+                rankings = soup.find_all("div", class_="rankings")
+                self.logger.info(f"Found {len(rankings)} rankings divs")
 
-            # Debug: Look for firm name specifically
-            h1_elements = soup.find_all("h1")
-            self.logger.info(f"Found h1 elements: {[h.get('class', []) for h in h1_elements]}")
+                # Debug: Look for firm name specifically
+                h1_elements = soup.find_all("h1")
+                self.logger.info(f"Found h1 elements: {[h.get('class', []) for h in h1_elements]}")
 
-            # Debug: Save raw HTML for inspection
-            debug_dir = Path("debug_html")
-            debug_dir.mkdir(exist_ok=True)
-            with open(debug_dir / f"raw_page_{url.split('=')[-1]}.html", "w", encoding='utf-8') as f:
-                f.write(str(soup.prettify()))
+                # Debug: Save raw HTML for inspection
+                debug_dir = Path("debug_html")
+                debug_dir.mkdir(exist_ok=True)
+                with open(debug_dir / f"raw_page_{url.split('=')[-1]}.html", "w", encoding='utf-8') as f:
+                    f.write(str(soup.prettify()))
 
             # Now try to extract data
             # Firm Name
@@ -1026,17 +3549,21 @@ class LawScraper:
                 data["Firm Name"] = firm_name.text.strip()
                 self.logger.info(f"Found firm name: {data['Firm Name']}")
 
-            # Rankings
-            # Am Law 200
-            amlaw_section = soup.find("p", class_="survey-name-firms", string="Am Law 200")
-            if amlaw_section:
-                self.logger.info("Found Am Law section")
-                rank_div = amlaw_section.find_parent("div", class_="rankings")
-                if rank_div:
-                    rank = rank_div.find("p", class_="rank-firms")
-                    if rank:
-                        data["Am Law 200 Ranking"] = rank.text.strip()
-                        self.logger.info(f"Found Am Law rank: {data['Am Law 200 Ranking']}")
+            # Rankings - the first rank-firms entry is the latest survey year
+            rank_surveys = {
+                "Am Law 200 Ranking": "Am Law 200",
+                "NLJ 500 Ranking": "NLJ 500"
+            }
+
+            for key, survey in rank_surveys.items():
+                survey_section = soup.find("p", class_="survey-name-firms", string=survey)
+                if survey_section:
+                    rank_div = survey_section.find_parent("div", class_="rankings")
+                    if rank_div:
+                        rank = rank_div.find("p", class_="rank-firms")
+                        if rank:
+                            data[key] = rank.text.strip()
+                            self.logger.info(f"Found {survey} rank: {data[key]}")
 
             # Metrics with overview-title
             metrics = {
@@ -1075,30 +3602,271 @@ class LawScraper:
             self.logger.error(f"Error extracting data: {str(e)}")
             self.logger.error(f"Error details:", exc_info=True)
 
-        return data
+        return FirmRecord.from_raw(url, data)
 
     def save_interim_data(self, all_data, failed_urls, output_file):
-        interim_file = Path(f"{output_file}_interim.xlsx")
-        pd.DataFrame(all_data).to_excel(interim_file, index=False)
+        self.export_workbook(all_data, failed_urls, f"{output_file}_interim.xlsx")
 
         if failed_urls:
-            failed_file = Path(f"{output_file}_failed_interim.xlsx")
-            pd.DataFrame(failed_urls, columns=["URL", "Error"]).to_excel(
-                failed_file, index=False
-            )
+            failed_writer = StreamingExcelWriter(f"{output_file}_failed_interim.xlsx")
+            failed_writer.write_sheet("Failed", FAILED_COLUMNS, failed_urls)
+            failed_writer.save()
 
     def save_final_data(self, all_data, failed_urls, output_file):
-        final_file = Path(f"{output_file}.xlsx")
-        pd.DataFrame(all_data).to_excel(final_file, index=False)
+        final_file = self.export_workbook(all_data, failed_urls, f"{output_file}.xlsx")
 
         if failed_urls:
-            failed_file = Path(f"{output_file}_failed.xlsx")
-            pd.DataFrame(failed_urls, columns=["URL", "Error"]).to_excel(
-                failed_file, index=False
-            )
+            failed_writer = StreamingExcelWriter(f"{output_file}_failed.xlsx")
+            failed_writer.write_sheet("Failed", FAILED_COLUMNS, failed_urls)
+            failed_writer.save()
 
         self.logger.info(f"Data saved to {final_file}")
 
+    def export_workbook(self, records, failed_urls, path):
+        # records may be any iterable (including a generator) of row dicts
+        writer = StreamingExcelWriter(path)
+        success_count = writer.write_sheet("Data", FIRM_COLUMNS, records)
+        if failed_urls:
+            writer.write_sheet("Failed", FAILED_COLUMNS, failed_urls)
+        writer.write_sheet("Summary", ["Metric", "Value"], self.run_summary(success_count, len(failed_urls)))
+        return writer.save()
+
+class SearchPanel:
+    def __init__(self, parent, main_window):
+        self.main_window = main_window
+        self.frame = ttk.LabelFrame(parent, text="Search Firms", padding="10")
+        self.frame.pack(fill="x", padx=10, pady=5)
+
+        entry_frame = ttk.Frame(self.frame)
+        entry_frame.pack(fill="x")
+        self.query_var = tk.StringVar()
+        entry = ttk.Entry(entry_frame, textvariable=self.query_var)
+        entry.pack(side="left", fill="x", expand=True, padx=5)
+        entry.bind("<Return>", lambda event: self.run_search())
+        ttk.Button(entry_frame, text="Search", command=self.run_search).pack(side="left", padx=5)
+
+        self.results = tk.Listbox(self.frame, height=6)
+        self.results.pack(fill="x", pady=5)
+
+    def run_search(self):
+        index = self.main_window.get_search_index()
+        if index is None:
+            return
+
+        self.results.delete(0, tk.END)
+        try:
+            matches = index.search(self.query_var.get())
+        except ValueError as e:
+            self.results.insert(tk.END, str(e))
+            return
+        if not matches:
+            self.results.insert(tk.END, "No matching firms")
+        for match in matches:
+            self.results.insert(tk.END, f"{match['firm_name']} (ID {match['firm_id']}): {match['snippet']}")
+
+class ResultsPanel:
+    """Live results table that only materializes the rows in view.
+
+    The Treeview holds a fixed set of visible_rows items whose values are
+    rewritten on scroll; the full ordering is a list of firm IDs taken from
+    the ResultIndex sort/range indexes. New records arrive through a queue
+    and are applied in batches on the Tk update timer.
+    """
+
+    COLUMNS = [
+        "Firm Name",
+        "Am Law 200 Ranking",
+        "NLJ 500 Ranking",
+        "Total Revenue",
+        "Profit Per Equity Partner",
+        "Revenue Per Lawyer",
+        "Total Headcount"
+    ]
+
+    def __init__(self, parent, index_provider, visible_rows=15):
+        self.index_provider = index_provider
+        self.visible_rows = visible_rows
+        self.frame = ttk.LabelFrame(parent, text="Results", padding="10")
+        self.frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        self.pending = Queue()
+        self.update_interval = 1000  # ms
+        self.view = []
+        self.offset = 0
+        self.sort_column = None
+        self.sort_descending = False
+        self.filter = None
+
+        self.setup_filter_bar()
+        self.setup_table()
+        self.frame.after(self.update_interval, self.apply_pending)
+
+    def setup_filter_bar(self):
+        filter_frame = ttk.Frame(self.frame)
+        filter_frame.pack(fill="x", pady=2)
+
+        ttk.Label(filter_frame, text="Filter:").pack(side="left", padx=5)
+        self.filter_field = tk.StringVar(value=list(INDEXED_FIELDS)[0])
+        ttk.Combobox(
+            filter_frame,
+            textvariable=self.filter_field,
+            values=list(INDEXED_FIELDS),
+            state="readonly",
+            width=12
+        ).pack(side="left", padx=2)
+        self.filter_range = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.filter_range, width=20).pack(side="left", padx=2)
+        ttk.Button(filter_frame, text="Apply", command=self.apply_filter).pack(side="left", padx=2)
+        ttk.Button(filter_frame, text="Clear", command=self.clear_filter).pack(side="left", padx=2)
+
+        self.count_label = ttk.Label(filter_frame, text="0 firms")
+        self.count_label.pack(side="right", padx=5)
+
+    def setup_table(self):
+        table_frame = ttk.Frame(self.frame)
+        table_frame.pack(fill="both", expand=True)
+
+        self.tree = ttk.Treeview(table_frame, columns=self.COLUMNS, show="headings", height=self.visible_rows)
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=220 if column == "Firm Name" else 110, anchor="w" if column == "Firm Name" else "e")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+
+        # Fixed pool of row items, rewritten in place as the window moves
+        self.row_items = [self.tree.insert("", "end", values=[""] * len(self.COLUMNS)) for _ in range(self.visible_rows)]
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll_rows(-1 if event.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda event: self.scroll_rows(-1))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_rows(1))
+
+    def enqueue(self, record):
+        # Called from the scraper thread
+        self.pending.put(record)
+
+    def request_refresh(self):
+        # Reload the view on the next tick, e.g. after the index was replaced
+        self.pending.put(None)
+
+    def apply_pending(self):
+        received = 0
+        while not self.pending.empty():
+            self.pending.get_nowait()
+            received += 1
+        if received:
+            self.refresh_view()
+        self.frame.after(self.update_interval, self.apply_pending)
+
+    def refresh_view(self):
+        index = self.index_provider()
+        if index is None:
+            return
+
+        field = self.field_for(self.sort_column)
+        if self.filter:
+            records = index.query({self.filter[0]: self.filter[1]}, field, self.sort_descending)
+            if self.sort_column == "Firm Name":
+                records.sort(key=lambda record: (record.firm_name or "").lower(), reverse=self.sort_descending)
+            self.view = [record.firm_id for record in records]
+        elif field:
+            with index.lock:
+                keys = index.range_slice(field)
+                records = index.snapshot()
+            ordered = [firm_id for _, firm_id in (reversed(keys) if self.sort_descending else keys)]
+            listed = set(ordered)
+            self.view = ordered + [firm_id for firm_id in records if firm_id not in listed]
+        elif self.sort_column == "Firm Name":
+            records = index.snapshot()
+            self.view = sorted(
+                records,
+                key=lambda firm_id: (records[firm_id].firm_name or "").lower(),
+                reverse=self.sort_descending
+            )
+        else:
+            self.view = list(index.snapshot())
+
+        self.offset = min(self.offset, max(len(self.view) - self.visible_rows, 0))
+        self.count_label.config(text=f"{len(self.view)} firms")
+        self.render()
+
+    def render(self):
+        index = self.index_provider()
+        window = self.view[self.offset:self.offset + self.visible_rows]
+        for position, item in enumerate(self.row_items):
+            record = index.get(window[position]) if position < len(window) and index is not None else None
+            if record is not None:
+                self.tree.item(item, values=self.format_row(record))
+            else:
+                self.tree.item(item, values=[""] * len(self.COLUMNS))
+
+        if self.view:
+            first = self.offset / len(self.view)
+            last = min((self.offset + self.visible_rows) / len(self.view), 1)
+            self.scrollbar.set(first, last)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def format_row(self, record):
+        values = []
+        for column in self.COLUMNS:
+            value = getattr(record, FIRM_FIELDS[column])
+            if value is None:
+                values.append("")
+            elif column in MONEY_COLUMNS:
+                values.append(f"${value:,}")
+            elif isinstance(value, int):
+                values.append(f"{value:,}")
+            else:
+                values.append(value)
+        return values
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.offset = int(float(amount) * len(self.view))
+            self.clamp_and_render()
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_rows(int(amount) * step)
+
+    def scroll_rows(self, rows):
+        self.offset += rows
+        self.clamp_and_render()
+
+    def clamp_and_render(self):
+        self.offset = max(0, min(self.offset, len(self.view) - self.visible_rows))
+        self.render()
+
+    def field_for(self, column):
+        for field, indexed_column in INDEXED_FIELDS.items():
+            if indexed_column == column:
+                return field
+        return None
+
+    def sort_by(self, column):
+        if self.sort_column == column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column, self.sort_descending = column, False
+        self.offset = 0
+        self.refresh_view()
+
+    def apply_filter(self):
+        try:
+            _, bounds = parse_range_argument(f"{self.filter_field.get()}={self.filter_range.get()}")
+        except (argparse.ArgumentTypeError, ValueError):
+            messagebox.showerror("Error", "Filter must be LOW:HIGH, either bound optional")
+            return
+        self.filter = (self.filter_field.get(), bounds)
+        self.offset = 0
+        self.refresh_view()
+
+    def clear_filter(self):
+        self.filter = None
+        self.filter_range.set("")
+        self.offset = 0
+        self.refresh_view()
+
 class ProgressFrame:
     def __init__(self, parent):
         self.frame = ttk.LabelFrame(parent, text="Progress", padding="10")
@@ -1152,6 +3920,8 @@ class MainWindow:
         self.control_panel = ControlPanel(self.main_frame, self)
         self.progress_frame = ProgressFrame(self.main_frame)
         self.graph_panel = GraphPanel(self.main_frame)
+        self.search_panel = SearchPanel(self.main_frame, self)
+        self.results_panel = ResultsPanel(self.main_frame, lambda: self.scraper.result_index)
 
         # Create status bar
         self.status_bar = ttk.Label(self.root, text="Ready", relief=tk.SUNKEN)
@@ -1163,6 +3933,7 @@ class MainWindow:
             self.stealth_manager,
             self.update_status
         )
+        self.scraper.record_callback = self.results_panel.enqueue
 
     def update_crawler(self, percentage, message=""):
         self.progress_frame.update_crawler(percentage, message)
@@ -1190,10 +3961,33 @@ class MainWindow:
             try:
                 # Initialize scraper
                 self.scraper.initialize(save_dir)
-
-                # Run crawling process
-                logging.info("Starting crawling phase...")
-                discovered_urls = self.scraper.crawl_ids(config, self)
+                self.scraper.BASE_URL = config.get('base_url') or DEFAULT_BASE_URL
+                self.scraper.columnar_format = config.get('columnar')
+                self.scraper.summary_charts = config.get('summary_charts', False)
+                self.results_panel.request_refresh()
+
+                if config.get('preflight'):
+                    self.update_status("Running preflight check...")
+                    passed, report = self.scraper.run_preflight()
+                    if not passed and not messagebox.askyesno(
+                        "Preflight Failed",
+                        f"Field coverage is below threshold for: {', '.join(report['failing_fields']) or 'all fields'}.\n"
+                        "The site layout may have changed. Start the run anyway?"
+                    ):
+                        return
+
+                if config['run_type'] == 'F':
+                    # Refresh runs revisit known firms instead of crawling
+                    logging.info("Planning refresh...")
+                    discovered_urls = self.scraper.plan_refresh(config, self)
+                elif config['run_type'] == 'D':
+                    # Discovery runs seed from listings and probe only likely gaps
+                    logging.info("Starting discovery phase...")
+                    discovered_urls = self.scraper.discover_ids(config, self)
+                else:
+                    # Run crawling process
+                    logging.info("Starting crawling phase...")
+                    discovered_urls = self.scraper.crawl_ids(config, self)
 
                 if discovered_urls:
                     logging.info(f"Crawling complete. Found {len(discovered_urls)} URLs. Starting scraping phase...")
@@ -1216,6 +4010,15 @@ class MainWindow:
         # Start scraping thread with collected info
         Thread(target=run_scraper, daemon=True).start()
 
+    def get_search_index(self):
+        # Before any run in this session, ask which save directory to search
+        if self.scraper.search_index is None:
+            save_dir = filedialog.askdirectory(title="Select a save directory to search")
+            if not save_dir:
+                return None
+            self.scraper.search_index = SearchIndex(Path(save_dir) / 'search.db')
+        return self.scraper.search_index
+
     def stop_scraping(self):
         if hasattr(self, 'scraper'):
             self.scraper.is_running = False
@@ -1231,8 +4034,14 @@ class MainWindow:
             default=1,
             help="Debug detail level"
         )
+        parser.add_argument("--status-port", type=int, help="Serve live metrics on this port (/status JSON, /metrics Prometheus)")
+        parser.add_argument("--status-host", default="127.0.0.1")
         args = parser.parse_args()
 
+        if args.status_port:
+            self.status_server = StatusServer(args.status_port, args.status_host).start()
+            self.status_server.register("gui", self.scraper.metrics)
+
         # Initialize debug mode if specified
         if args.debug:
             self.debug_manager.enabled = True
@@ -1244,7 +4053,523 @@ class MainWindow:
         # Start the GUI
         self.root.mainloop()
 
+class JobProgress:
+    """Headless stand-in for the GUI progress window.
+
+    Logs progress, and while started keeps the job's heartbeat fresh from
+    a background thread so other workers don't reclaim it. Beating apart
+    from progress matters: a rate-limit backoff can sit silent for longer
+    than JOB_STALE_AFTER.
+    """
+
+    def __init__(self, queue: JobQueue, job_id: int, logger):
+        self.queue = queue
+        self.job_id = job_id
+        self.logger = logger
+        self.last_log = 0
+        self.stopped = Event()
+        self.beater = Thread(target=self.beat, daemon=True)
+
+    def start(self):
+        self.queue.heartbeat(self.job_id)
+        self.beater.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.beater.join()
+
+    def beat(self):
+        while not self.stopped.wait(JOB_HEARTBEAT_INTERVAL):
+            try:
+                self.queue.heartbeat(self.job_id)
+            except sqlite3.Error as e:
+                self.logger.warning(f"Job {self.job_id} heartbeat failed: {e}")
+
+    def update_crawler(self, percentage, message=""):
+        self.update("crawl", percentage, message)
+
+    def update_scraper(self, percentage, message=""):
+        self.update("scrape", percentage, message)
+
+    def update(self, stage, percentage, message):
+        now = time.time()
+        if now - self.last_log >= JOB_HEARTBEAT_INTERVAL or percentage >= 100:
+            self.last_log = now
+            self.logger.info(f"Job {self.job_id} {stage} {percentage:.0f}%: {message}")
+
+class JobWorker:
+    """Claims jobs from a JobQueue and runs them one at a time until stopped.
+
+    A job first collects its URLs (crawl, discovery, refresh plan or the
+    given ID list), checkpoints them, then scrapes them into its sink. A
+    reclaimed job with a URL checkpoint skips straight to scraping, where
+    the snapshot and HTTP cache make already-fetched pages cheap; crawl
+    progress itself resumes from the job's own progress file.
+    """
+
+    def __init__(self, queue: JobQueue, rate_limiter: RateLimiter, preflight: bool = False,
+                 status_server: Optional[StatusServer] = None):
+        self.queue = queue
+        self.rate_limiter = rate_limiter
+        self.preflight = preflight
+        self.status_server = status_server
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.logger = logging.getLogger('JobWorker')
+        self.scraper = None
+        self.snapshot = {"kind": "worker", "worker": self.worker_id, "job": None, "jobs": {}}
+        if status_server:
+            status_server.register("worker", self)
+
+    def publish(self, job_id=None):
+        self.snapshot = {"kind": "worker", "worker": self.worker_id, "job": job_id, "jobs": self.queue.counts()}
+
+    def run(self, once: bool = False, poll_interval: float = JOB_POLL_INTERVAL):
+        self.logger.info(f"Worker {self.worker_id} polling {self.queue.path}")
+        while True:
+            job = self.queue.claim(self.worker_id)
+            self.publish(job['id'] if job else None)
+            if job is None:
+                if once:
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            try:
+                self.run_job(job)
+            except KeyboardInterrupt:
+                self.logger.warning(f"Interrupted; job {job['id']} requeued from its last checkpoint")
+                self.queue.requeue(job['id'])
+                raise
+            except Exception as e:
+                self.logger.error(f"Job {job['id']} failed: {e}", exc_info=True)
+                self.queue.finish(job['id'], "failed", error=str(e))
+            finally:
+                if self.status_server:
+                    self.status_server.unregister(f"job-{job['id']}")
+                if self.scraper and self.scraper.search_index:
+                    self.scraper.search_index.close()
+                self.scraper = None
+                self.publish()
+
+    def run_job(self, job: Dict):
+        self.logger.info(f"Running job {job['id']} ({job['mode']}, attempt {job['attempts']}) into {job['sink']}")
+        progress = JobProgress(self.queue, job['id'], self.logger)
+        progress.start()
+        try:
+            self.execute(job, progress)
+        finally:
+            progress.stop()
+
+    def execute(self, job: Dict, progress: JobProgress):
+        self.scraper = scraper = LawScraper(DebugManager(), StealthManager(), self.logger.info)
+        scraper.rate_limiter = self.rate_limiter
+        scraper.initialize(job['store'])
+        scraper.progress_file = Path(job['store']) / f"job_{job['id']}_progress.json"
+        scraper.BASE_URL = job['options'].get('base_url') or DEFAULT_BASE_URL
+        scraper.columnar_format = job['options'].get('columnar')
+        scraper.summary_charts = job['options'].get('summary_charts', False)
+        scraper.metrics.name = f"job-{job['id']}"
+        if self.status_server:
+            self.status_server.register(f"job-{job['id']}", scraper.metrics)
+
+        if self.preflight and job['mode'] != "reparse":
+            passed, report = scraper.run_preflight()
+            if not passed:
+                self.queue.finish(job['id'], "failed", result=report, error="Preflight failed")
+                return
+
+        checkpoint = job['checkpoint'] or {}
+        if "urls" in checkpoint:
+            urls = checkpoint["urls"]
+            scraper.crawl_scope = tuple(checkpoint["crawl_scope"]) if checkpoint.get("crawl_scope") else None
+            self.logger.info(f"Job {job['id']} resuming with {len(urls)} checkpointed URLs")
+        else:
+            urls = self.collect_urls(scraper, job, progress)
+            if not scraper.is_running:
+                self.queue.requeue(job['id'])
+                return
+            self.queue.checkpoint(job['id'], {"phase": "scrape", "urls": urls, "crawl_scope": scraper.crawl_scope})
+
+        success_count = fail_count = 0
+        if urls:
+            scraper.is_running = True
+            success_count, fail_count = scraper.scrape_data(
+                urls, job['sink'], progress, offline=job['mode'] == "reparse"
+            )
+
+        result = {"urls": len(urls), "records": success_count, "failed": fail_count}
+        if scraper.halt_reason:
+            self.queue.finish(job['id'], "halted", result=result, error=scraper.halt_reason)
+        else:
+            self.queue.finish(job['id'], "done", result=result)
+        self.logger.info(f"Job {job['id']} finished: {success_count} records, {fail_count} failed")
+
+    def collect_urls(self, scraper, job: Dict, progress: JobProgress) -> List[str]:
+        options = job['options']
+        config = {
+            'run_type': 'R' if job['attempts'] > 1 else 'N',
+            'range_start': job['range_start'],
+            'range_end': job['range_end'],
+            'test_count': options.get('test_count'),
+            'refresh_budget': options.get('refresh_budget'),
+            'probe_budget': options.get('probe_budget'),
+            'seed_urls': options.get('seed_urls')
+        }
+
+        scraper.is_running = True
+        if job['ids']:
+            return [scraper.BASE_URL.format(firm_id) for firm_id in job['ids']]
+        if job['mode'] == "discover":
+            return scraper.discover_ids(config, progress)
+        if job['mode'] == "refresh":
+            return scraper.plan_refresh(config, progress)
+        if job['mode'] == "reparse":
+            in_range = lambda firm_id: job['range_start'] is None or job['range_start'] <= firm_id <= job['range_end']
+            return [scraper.BASE_URL.format(firm_id) for firm_id in sorted(map(int, scraper.snapshot.previous)) if in_range(firm_id)]
+        return scraper.crawl_ids(config, progress)
+
+def parse_range_argument(text):
+    # "field=low:high" with either bound optional, e.g. "rpl=1000000:"
+    field, _, bounds = text.partition("=")
+    if field not in INDEXED_FIELDS or ":" not in bounds:
+        raise argparse.ArgumentTypeError(f"Expected FIELD=LOW:HIGH with FIELD in {', '.join(INDEXED_FIELDS)}")
+    low, high = bounds.split(":", 1)
+    return field, (int(low) if low else None, int(high) if high else None)
+
+def run_query_cli(argv):
+    parser = argparse.ArgumentParser(prog="law_scraper.py query", description="Query scraped firm results")
+    parser.add_argument("--store", required=True, help="Save directory of a previous run")
+    parser.add_argument("--range", dest="ranges", action="append", type=parse_range_argument, default=[],
+                        help="FIELD=LOW:HIGH, repeatable (fields: " + ", ".join(INDEXED_FIELDS) + ")")
+    parser.add_argument("--order-by", choices=list(INDEXED_FIELDS))
+    parser.add_argument("--desc", action="store_true", help="Sort descending")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--name", help="Exact firm name lookup")
+    parser.add_argument("--id", type=int, help="Firm URL ID lookup")
+    args = parser.parse_args(argv)
+
+    index = ResultIndex.from_snapshot(Path(args.store) / 'firm_snapshot.json')
+    if args.id is not None:
+        records = [record for record in [index.get(args.id)] if record]
+    elif args.name:
+        records = index.find_name(args.name)
+    else:
+        records = index.query(dict(args.ranges), args.order_by, args.desc, args.limit)
+
+    if not records:
+        print("No matching firms")
+        return 1
+    columns = [column for column in FIRM_COLUMNS if column not in ("URL", "Firm Description")]
+    print(FirmRecord.to_frame(records)[columns].to_string(index=False))
+    return 0
+
+def run_search_cli(argv):
+    parser = argparse.ArgumentParser(prog="law_scraper.py search", description="Full-text search over firm names and descriptions")
+    parser.add_argument("--store", required=True, help="Save directory of a previous run")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--raw", action="store_true", help="Pass the query to FTS5 unchanged (AND/OR/NEAR, prefix*)")
+    parser.add_argument("terms", nargs="+")
+    args = parser.parse_args(argv)
+
+    index = SearchIndex(Path(args.store) / 'search.db')
+    if index.count() == 0:
+        index.add_many(ResultIndex.from_snapshot(Path(args.store) / 'firm_snapshot.json').records.values())
+
+    try:
+        matches = index.search(" ".join(args.terms), args.limit, args.raw)
+    except ValueError as e:
+        print(e)
+        return 2
+    if not matches:
+        print("No matching firms")
+        return 1
+    for match in matches:
+        print(f"{match['score']:8.3f}  {match['firm_id']:>6}  {match['firm_name']}: {match['snippet']}")
+    return 0
+
+def run_dedup_cli(argv):
+    parser = argparse.ArgumentParser(prog="law_scraper.py dedup", description="Merge records of the same firm across runs and IDs")
+    parser.add_argument("--store", required=True, action="append",
+                        help="Save directory of a run; repeat to combine runs (later stores win per ID)")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD, help="Name trigram similarity needed to merge")
+    parser.add_argument("--output", help="Output file prefix (default: <first store>/firm_entities)")
+    args = parser.parse_args(argv)
+
+    records = {}
+    for store in args.store:
+        records.update(ResultIndex.from_snapshot(Path(store) / 'firm_snapshot.json').records)
+
+    started = time.time()
+    groups = EntityResolver(args.threshold).resolve(list(records.values()))
+    elapsed = time.time() - started
+
+    output = args.output or str(Path(args.store[0]) / 'firm_entities')
+    entities = {
+        canonical_id: {
+            "member_ids": [record.firm_id for record in members],
+            "names": sorted({record.firm_name for record in members}),
+            "record": EntityResolver.merge(members).to_dict()
+        }
+        for canonical_id, members in groups.items()
+    }
+    with open(f"{output}.json", "w") as f:
+        json.dump(entities, f, indent=4)
+
+    writer = StreamingExcelWriter(f"{output}.xlsx")
+    writer.write_sheet(
+        "Entities",
+        ["Canonical ID", "Member IDs", "Names"] + FIRM_COLUMNS,
+        ([canonical_id, entity["member_ids"], entity["names"]] + list(entity["record"].values())
+         for canonical_id, entity in entities.items())
+    )
+    writer.save()
+
+    merged = sum(1 for entity in entities.values() if len(entity["member_ids"]) > 1)
+    print(f"{len(records)} records -> {len(entities)} firms ({merged} merged groups) in {elapsed:.2f}s")
+    print(f"Wrote {output}.json and {output}.xlsx")
+    return 0
+
+def run_summary_cli(argv):
+    parser = argparse.ArgumentParser(prog="law_scraper.py summary", description="Aggregate summary of all known firms")
+    parser.add_argument("--store", required=True, help="Save directory of a previous run")
+    parser.add_argument("--output", help="Output file prefix (default: <store>/firms)")
+    parser.add_argument("--charts", action="store_true", help="Also render PNG charts")
+    args = parser.parse_args(argv)
+
+    snapshot = SnapshotStore(Path(args.store) / 'firm_snapshot.json')
+    if not snapshot.previous:
+        print("No firms in this store")
+        return 1
+
+    report = SummaryReport(args.store)
+    summary = report.update(snapshot.previous)
+    output = args.output or str(Path(args.store) / 'firms')
+    paths = report.write(summary, output)
+    if args.charts:
+        paths += report.write_charts(summary, output)
+
+    print(f"{summary['firms']} firms ({report.source})")
+    for survey, tiers in summary["rank_tiers"].items():
+        print(f"  {survey}: " + ", ".join(f"{tier} {count}" for tier, count in tiers.items()))
+    for name, values in summary["percentiles"].items():
+        if values["count"]:
+            print(f"  {name}: median ${values['p50']:,} (p10 ${values['p10']:,}, p90 ${values['p90']:,})")
+    print("Wrote " + ", ".join(str(path) for path in paths))
+    return 0
+
+def run_history_cli(argv):
+    parser = argparse.ArgumentParser(prog="law_scraper.py history", description="Query per-year survey ranking history")
+    parser.add_argument("--store", required=True, help="Save directory of a previous run")
+    parser.add_argument("--firm", type=int, help="Show every survey rank of one firm ID")
+    parser.add_argument("--survey", default="Am Law 200", help="Survey for --climbers (default: Am Law 200)")
+    parser.add_argument("--climbers", type=int, metavar="PLACES", help="Firms that climbed at least PLACES ranks")
+    parser.add_argument("--years", type=int, default=5, help="Span for --climbers, ending at the latest year")
+    parser.add_argument("--from-year", type=int)
+    parser.add_argument("--to-year", type=int)
+    args = parser.parse_args(argv)
+
+    history = RankHistoryStore(Path(args.store) / RANK_HISTORY_DIR)
+    if not history.years():
+        print("No ranking history in this store; run a scrape or reparse job first")
+        return 1
+
+    if args.firm is not None:
+        series = history.series(args.firm)
+        for survey, year, rank in series:
+            print(f"{survey:<14} {year}  #{rank}")
+        return 0 if series else 1
+
+    if args.climbers is None:
+        print(f"Years: {', '.join(map(str, history.years()))}; surveys: {', '.join(history.surveys)}")
+        return 0
+
+    names = ResultIndex.from_snapshot(Path(args.store) / 'firm_snapshot.json')
+    climbers = history.climbers(args.survey, args.climbers, args.from_year, args.to_year, args.years)
+    if not climbers:
+        print("No matching firms")
+        return 1
+    for climber in climbers:
+        record = names.get(climber["firm_id"])
+        print(f"+{climber['climb']:<4} #{climber['start_rank']:<4} -> #{climber['end_rank']:<4} "
+              f"{climber['firm_id']:>6}  {record.firm_name if record else ''}")
+    return 0
+
+def run_fixtures_cli(argv):
+    parser = argparse.ArgumentParser(prog="law_scraper.py fixtures", description="Serve debug_html pages as a local test site")
+    parser.add_argument("--pages", default=PREFLIGHT_PAGES_DIR, help="Directory of stored raw_response_<id>.txt pages")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--check", action="store_true",
+                        help="Run discovery against the fixtures, check every stored profile is found, then exit")
+    args = parser.parse_args(argv)
+
+    fixtures = FixtureServer(Path(args.pages).resolve(), 0 if args.check else args.port).start()
+    if not fixtures.pages or fixtures.invalid_page is None:
+        print(f"Need both valid profile and invalid-ID pages in {args.pages}")
+        return 1
+
+    if not args.check:
+        print(f"Serving {len(fixtures.pages)} profiles from {args.pages}")
+        print(f"Base URL:  {fixtures.base_url}")
+        print(f"Seed URLs: {', '.join(fixtures.seed_urls)}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            fixtures.stop()
+            return 0
+
+    workdir = tempfile.mkdtemp(prefix="law_scraper_fixtures_")
+
+    scraper = LawScraper(DebugManager(), StealthManager(), lambda message: None)
+    scraper.BASE_URL = fixtures.base_url
+    scraper.initialize(Path(workdir) / "store")
+
+    class Progress:
+        def update_crawler(self, percentage, message=""):
+            pass
+
+    range_end = max(fixtures.pages) + DISCOVERY_WINDOW
+    urls = scraper.discover_ids({
+        'run_type': 'N',
+        'range_start': 1,
+        'range_end': range_end,
+        'test_count': None,
+        'seed_urls': fixtures.seed_urls,
+        'delay_range': (0, 0)
+    }, Progress())
+    fixtures.stop()
+
+    found = {firm_id_from_url(url) for url in urls}
+    missed = sorted(set(fixtures.pages) - found)
+    probes = scraper.stats['successful_requests'] + scraper.stats['failed_requests']
+    print(f"Fixture profiles: {sorted(fixtures.pages)}")
+    print(f"Discovered {sorted(found)} in 1-{range_end} with {probes} probes and "
+          f"{scraper.stats['requests_made']} requests (a full crawl would make {range_end})")
+    if missed:
+        print(f"FAILED: discovery missed {missed}")
+        return 1
+    print("OK")
+    return 0
+
+def parse_id_range(text):
+    try:
+        start, end = map(int, text.split("-"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Expected START-END, e.g. 1-500")
+    return start, end
+
+def run_jobs_cli(argv):
+    parser = argparse.ArgumentParser(prog="law_scraper.py jobs", description="Manage the persistent job queue")
+    parser.add_argument("--queue", default=DEFAULT_JOB_QUEUE, help="Job queue database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Queue a job")
+    add.add_argument("--mode", choices=JOB_MODES, required=True)
+    add.add_argument("--store", required=True, help="Save directory for the job's state and outputs")
+    add.add_argument("--sink", help="Output file prefix (default: <store>/job_<id>_<mode>)")
+    targets = add.add_mutually_exclusive_group()
+    targets.add_argument("--range", type=parse_id_range, help="ID range START-END")
+    targets.add_argument("--ids", type=lambda text: [int(firm_id) for firm_id in text.split(",")],
+                         help="Comma-separated firm IDs")
+    add.add_argument("--priority", type=int, default=0, help="Higher runs first")
+    add.add_argument("--test-count", type=int)
+    add.add_argument("--refresh-budget", type=int)
+    add.add_argument("--probe-budget", type=int)
+    add.add_argument("--columnar", choices=list(COLUMNAR_FORMATS), help="Also export records as Parquet/Feather")
+    add.add_argument("--base-url", help="Profile URL template with an id={} query parameter for the firm ID")
+    add.add_argument("--seed-url", dest="seed_urls", action="append", help="Discovery seed page or sitemap; repeatable")
+    add.add_argument("--charts", action="store_true", help="Render summary charts")
+
+    listing = commands.add_parser("list", help="Show jobs")
+    listing.add_argument("--status")
+
+    cancel = commands.add_parser("cancel", help="Cancel a queued job")
+    cancel.add_argument("job_id", type=int)
+
+    args = parser.parse_args(argv)
+    queue = JobQueue(args.queue)
+
+    if args.command == "add":
+        if args.mode in ("scrape", "discover") and not (args.range or args.ids):
+            parser.error(f"{args.mode} jobs need --range or --ids")
+        if args.base_url and not is_profile_url_template(args.base_url):
+            parser.error("--base-url must have an id={} query parameter where the firm ID goes")
+        options = {
+            key: value for key, value in (
+                ("test_count", args.test_count),
+                ("refresh_budget", args.refresh_budget),
+                ("probe_budget", args.probe_budget),
+                ("columnar", args.columnar),
+                ("base_url", args.base_url),
+                ("seed_urls", args.seed_urls),
+                ("summary_charts", args.charts or None)
+            ) if value is not None
+        }
+        try:
+            job_id = queue.add(args.mode, args.store, args.sink, args.range, args.ids, args.priority, options)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Queued job {job_id}")
+    elif args.command == "list":
+        jobs = queue.list(args.status)
+        if not jobs:
+            print("No jobs")
+        for job in jobs:
+            target = (f"{job['range_start']}-{job['range_end']}" if job['range_start'] is not None
+                      else f"{len(job['ids'])} IDs" if job['ids'] else "all")
+            detail = job['error'] or (json.dumps(job['result']) if job['result'] else "")
+            print(f"{job['id']:>5}  {job['status']:<9} p{job['priority']:<3} {job['mode']:<9} {target:<14} "
+                  f"{job['sink']}  {detail}")
+    else:
+        if not queue.cancel(args.job_id):
+            print(f"Job {args.job_id} is not queued")
+            return 1
+        print(f"Cancelled job {args.job_id}")
+    return 0
+
+def run_worker_cli(argv):
+    parser = argparse.ArgumentParser(prog="law_scraper.py worker", description="Run queued jobs unattended")
+    parser.add_argument("--queue", default=DEFAULT_JOB_QUEUE, help="Job queue database file")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE_LIMIT,
+                        help="Requests per minute, shared by all workers on the queue")
+    parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    parser.add_argument("--poll", type=float, default=JOB_POLL_INTERVAL, help="Seconds between polls of an empty queue")
+    parser.add_argument("--preflight", action="store_true", help="Run the preflight check before each job")
+    parser.add_argument("--status-port", type=int, help="Serve live metrics on this port (/status JSON, /metrics Prometheus)")
+    parser.add_argument("--status-host", default="127.0.0.1")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    queue = JobQueue(args.queue)
+    status_server = StatusServer(args.status_port, args.status_host).start() if args.status_port else None
+    if status_server:
+        logging.info(f"Status endpoint on http://{args.status_host}:{status_server.address[1]}/status")
+    try:
+        JobWorker(queue, RateLimiter(queue, args.rate), args.preflight, status_server).run(args.once, args.poll)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if status_server:
+            status_server.stop()
+        queue.close()
+    return 0
+
+# Command-line subcommands; with none given the GUI starts
+CLI_COMMANDS = {
+    "query": run_query_cli,
+    "search": run_search_cli,
+    "dedup": run_dedup_cli,
+    "history": run_history_cli,
+    "summary": run_summary_cli,
+    "fixtures": run_fixtures_cli,
+    "jobs": run_jobs_cli,
+    "worker": run_worker_cli
+}
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        sys.exit(CLI_COMMANDS[sys.argv[1]](sys.argv[2:]))
+
     # Set up logging directory
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)